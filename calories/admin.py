@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Food, DailyLog
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
+from .models import Food, DailyLog, DailyNutritionSummary, Recipe, RecipeComponent
 
 
 @admin.register(Food)
@@ -14,3 +16,55 @@ class DailyLogAdmin(admin.ModelAdmin):
     list_display = ["user", "food", "quantity_grams", "date", "order"]
     list_filter = ["user", "date"]
     search_fields = ["food__name", "user__username"]
+
+
+@admin.register(DailyNutritionSummary)
+class DailyNutritionSummaryAdmin(admin.ModelAdmin):
+    list_display = ["user", "date", "total_calories", "entries_count"]
+    list_filter = ["user", "date"]
+    search_fields = ["user__username"]
+
+
+class RecipeComponentFormSet(BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        for form in self.forms:
+            food = form.cleaned_data.get("food")
+            if food is None or form.cleaned_data.get("DELETE"):
+                continue
+            if food.user_id != self.instance.user_id:
+                raise ValidationError(
+                    f'O alimento "{food.name}" não pertence ao dono da receita'
+                )
+            if Recipe.objects.filter(food=food).exists():
+                raise ValidationError("Receitas não podem ser usadas como ingrediente")
+
+
+class RecipeComponentInline(admin.TabularInline):
+    model = RecipeComponent
+    formset = RecipeComponentFormSet
+    extra = 1
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "food":
+            kwargs["queryset"] = Food.objects.filter(recipe__isnull=True)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Recipe)
+class RecipeAdmin(admin.ModelAdmin):
+    list_display = ["name", "user", "total_grams", "calories_per_100g"]
+    list_filter = ["user"]
+    search_fields = ["name"]
+    readonly_fields = [
+        "total_grams",
+        "calories_per_100g",
+        "protein_per_100g",
+        "carbs_per_100g",
+        "fat_per_100g",
+    ]
+    inlines = [RecipeComponentInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        form.instance.refresh_nutrients()
@@ -1,5 +1,5 @@
 from django import forms
-from .models import Food, DailyLog
+from .models import Food, DailyLog, Recipe
 
 
 class FoodForm(forms.ModelForm):
@@ -7,6 +7,15 @@ class FoodForm(forms.ModelForm):
         model = Food
         fields = ["name", "serving_size_grams", "calories", "protein", "carbs", "fat"]
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk and Recipe.objects.filter(food=self.instance).exists():
+            raise forms.ValidationError(
+                "Este alimento é calculado a partir de uma receita. "
+                "Edite a receita para alterá-lo."
+            )
+        return cleaned_data
+
 
 class DailyLogForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,91 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from shared.importers import StreamingImporter, TAMANHO_LOTE_PADRAO
+from .forms import FoodForm
+from .models import Food
+
+ALIASES_CAMPOS = {
+    "name": ["name", "nome", "alimento", "descricao", "description"],
+    "serving_size_grams": [
+        "serving_size_grams",
+        "serving_size",
+        "porcao",
+        "porcao_g",
+        "gramas",
+    ],
+    "calories": ["calories", "calorias", "kcal", "energia_kcal", "energy_kcal"],
+    "protein": ["protein", "proteina", "proteinas", "protein_g"],
+    "carbs": ["carbs", "carboidrato", "carboidratos", "carbohydrate", "carbs_g"],
+    "fat": ["fat", "gordura", "gorduras", "lipidios", "total_fat", "fat_g"],
+}
+
+PORCAO_PADRAO_GRAMAS = "100"
+
+
+class FoodImporter(StreamingImporter):
+    def __init__(self, user, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        super().__init__(user, tamanho_lote)
+        self.importados = 0
+        self.campos_formulario = FoodForm().fields
+
+    @classmethod
+    def mapear_linha(cls, linha):
+        dados = cls.extrair_campos(linha, ALIASES_CAMPOS)
+        for campo, valor in dados.items():
+            if campo != "name":
+                dados[campo] = valor.replace(",", ".")
+
+        dados.setdefault("serving_size_grams", PORCAO_PADRAO_GRAMAS)
+        return dados
+
+    def validar_linha(self, dados):
+        limpos, erros = {}, {}
+        for nome, campo in self.campos_formulario.items():
+            try:
+                limpos[nome] = campo.clean(dados.get(nome))
+            except ValidationError as e:
+                erros[nome] = e.messages
+        return limpos, erros
+
+    def _salvar_lote(self, lote):
+        if not lote:
+            return
+        with transaction.atomic():
+            Food.objects.bulk_create(lote)
+        self.importados += len(lote)
+        lote.clear()
+
+    def importar(self, arquivo, formato="csv"):
+        lote = []
+
+        for numero_linha, linha in enumerate(self.ler_linhas(arquivo, formato), 1):
+            if not isinstance(linha, dict):
+                self._registrar_erro(numero_linha, {"__all__": ["Linha inválida"]})
+                continue
+
+            dados, erros = self.validar_linha(self.mapear_linha(linha))
+            if erros:
+                self._registrar_erro(numero_linha, erros)
+                continue
+
+            lote.append(
+                Food(
+                    user=self.user,
+                    normalized_name=Food.normalize_name(dados["name"]),
+                    **dados,
+                )
+            )
+
+            if len(lote) >= self.tamanho_lote:
+                self._salvar_lote(lote)
+
+        self._salvar_lote(lote)
+        return self.resultado()
+
+    def resultado(self):
+        return {
+            "importados": self.importados,
+            "total_erros": self.total_erros,
+            "erros": self.erros,
+        }
@@ -0,0 +1,116 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from calories.models import DailyLog, Food
+from calories.nutrients import NutrientEngine
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o cálculo de nutrientes por propriedades em Decimal com o motor "
+        "em inteiros sobre registros sintéticos e verifica se os resultados "
+        "coincidem"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10_000, 1_000_000],
+            help="Quantidades de registros sintéticos a medir",
+        )
+        parser.add_argument(
+            "--foods", type=int, default=500, help="Número de alimentos distintos"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Semente aleatória")
+
+    @staticmethod
+    def _centesimos(gerador, maximo):
+        return Decimal(gerador.randint(0, maximo * 100)).scaleb(-2)
+
+    def _gerar_alimentos(self, gerador, quantidade):
+        return [
+            Food(
+                name=f"Alimento {i}",
+                serving_size_grams=self._centesimos(gerador, 500) or Decimal("1.00"),
+                calories=gerador.randint(0, 900),
+                protein=self._centesimos(gerador, 100),
+                carbs=self._centesimos(gerador, 100),
+                fat=self._centesimos(gerador, 100),
+            )
+            for i in range(quantidade)
+        ]
+
+    @staticmethod
+    def _calcular_propriedades(log):
+        def fator():
+            return (
+                log.quantity_grams / log.food.serving_size_grams
+                if log.food.serving_size_grams > 0
+                else Decimal(0)
+            )
+
+        return (
+            round(log.food.calories * fator()),
+            (log.food.protein * fator()).quantize(Decimal("0.01")),
+            (log.food.carbs * fator()).quantize(Decimal("0.01")),
+            (log.food.fat * fator()).quantize(Decimal("0.01")),
+        )
+
+    @staticmethod
+    def _medir(funcao):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        return resultado, time.perf_counter() - inicio
+
+    def handle(self, *args, **options):
+        gerador = random.Random(options["seed"])
+        alimentos = self._gerar_alimentos(gerador, options["foods"])
+
+        for tamanho in options["sizes"]:
+            logs = [
+                DailyLog(
+                    food=gerador.choice(alimentos),
+                    quantity_grams=self._centesimos(gerador, 1000),
+                )
+                for _ in range(tamanho)
+            ]
+            NutrientEngine.vetor_alimento.cache_clear()
+
+            esperados, tempo_decimal = self._medir(
+                lambda: [self._calcular_propriedades(log) for log in logs]
+            )
+            lote, tempo_lote = self._medir(
+                lambda: NutrientEngine.calcular_lote(
+                    (log.food, log.quantity_grams) for log in logs
+                )
+            )
+            por_registro, tempo_registro = self._medir(
+                lambda: [log.nutrient_values for log in logs]
+            )
+            _, tempo_cache = self._medir(lambda: [log.nutrient_values for log in logs])
+
+            divergencias = sum(
+                1
+                for esperado, obtido, calculado in zip(esperados, lote, por_registro)
+                if esperado != obtido or esperado != calculado
+            )
+            if divergencias:
+                raise CommandError(
+                    f"{divergencias} de {tamanho} registro(s) com resultado divergente."
+                )
+
+            self.stdout.write(
+                f"{tamanho} registros: propriedades Decimal {tempo_decimal:.2f}s, "
+                f"inteiros em lote {tempo_lote:.2f}s, "
+                f"inteiros por registro {tempo_registro:.2f}s, "
+                f"repetindo com cache {tempo_cache:.2f}s"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS("Resultados idênticos ao cálculo Decimal.")
+        )
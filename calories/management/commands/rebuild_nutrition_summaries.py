@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from calories.models import (
+    DailyLog,
+    DailyNutritionSummary,
+    SUMMARY_FIELDS,
+    TDEEEstimate,
+)
+from users.models import DataVersion
+
+
+class Command(BaseCommand):
+    help = "Reconstrói ou verifica o resumo nutricional diário a partir dos registros"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Apenas compara os resumos com os registros, sem alterar nada",
+        )
+        parser.add_argument(
+            "--user", help="Restringe a operação ao usuário com este username"
+        )
+
+    def handle(self, *args, **options):
+        logs = DailyLog.objects.all()
+        summaries = DailyNutritionSummary.objects.all()
+        estimates = TDEEEstimate.objects.all()
+
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário "{options["user"]}" não encontrado.')
+            logs = logs.filter(user=user)
+            summaries = summaries.filter(user=user)
+            estimates = estimates.filter(user=user)
+
+        esperados = {
+            (linha.pop("user"), linha.pop("date")): linha
+            for linha in logs.order_by()
+            .values("user", "date")
+            .annotate(**DailyNutritionSummary.totals_aggregates())
+        }
+
+        if options["verify"]:
+            self._verificar(esperados, summaries)
+        else:
+            self._reconstruir(esperados, summaries, estimates)
+
+    def _verificar(self, esperados, summaries):
+        atuais = {
+            (linha.pop("user"), linha.pop("date")): linha
+            for linha in summaries.values("user", "date", *SUMMARY_FIELDS)
+        }
+
+        divergencias = 0
+        for chave in sorted(set(esperados) | set(atuais)):
+            esperado = esperados.get(chave, DailyNutritionSummary.empty_totals())
+            atual = atuais.get(chave, DailyNutritionSummary.empty_totals())
+            if any(esperado[campo] != atual[campo] for campo in SUMMARY_FIELDS):
+                divergencias += 1
+                user_id, data = chave
+                self.stdout.write(
+                    f"Usuário {user_id} em {data}: esperado {esperado}, "
+                    f"encontrado {atual}"
+                )
+
+        if divergencias:
+            raise CommandError(f"{divergencias} dia(s) com resumo divergente.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(esperados)} dia(s) verificados, sem divergências."
+            )
+        )
+
+    def _reconstruir(self, esperados, summaries, estimates):
+        novos = [
+            DailyNutritionSummary(user_id=user_id, date=data, **totais)
+            for (user_id, data), totais in esperados.items()
+        ]
+
+        usuarios = {user_id for user_id, _ in esperados}
+        usuarios.update(summaries.values_list("user", flat=True).distinct())
+
+        with transaction.atomic():
+            summaries.delete()
+            DailyNutritionSummary.objects.bulk_create(novos, batch_size=500)
+            estimates.delete()
+            for user_id in usuarios:
+                DataVersion.bump(user_id, "daily_log")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(novos)} resumo(s) diário(s) reconstruídos.")
+        )
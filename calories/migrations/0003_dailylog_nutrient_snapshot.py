@@ -0,0 +1,74 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:10
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def preencher_nutrientes(apps, schema_editor):
+    DailyLog = apps.get_model("calories", "DailyLog")
+
+    logs = list(DailyLog.objects.select_related("food"))
+    for log in logs:
+        food = log.food
+        fator = (
+            log.quantity_grams / food.serving_size_grams
+            if food.serving_size_grams > 0
+            else Decimal(0)
+        )
+        log.calories = round(food.calories * fator)
+        log.protein = (food.protein * fator).quantize(Decimal("0.01"))
+        log.carbs = (food.carbs * fator).quantize(Decimal("0.01"))
+        log.fat = (food.fat * fator).quantize(Decimal("0.01"))
+
+    DailyLog.objects.bulk_update(
+        logs, ["calories", "protein", "carbs", "fat"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calories", "0002_alter_dailylog_options_dailylog_order"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailylog",
+            name="calories",
+            field=models.IntegerField(
+                default=0, help_text="Calorias consumidas (calculadas no registro)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailylog",
+            name="carbs",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Carboidratos consumidos em gramas (calculados no registro)",
+                max_digits=7,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailylog",
+            name="fat",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Gorduras consumidas em gramas (calculadas no registro)",
+                max_digits=7,
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailylog",
+            name="protein",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Proteínas consumidas em gramas (calculadas no registro)",
+                max_digits=7,
+            ),
+        ),
+        migrations.RunPython(preencher_nutrientes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def preencher_resumos(apps, schema_editor):
+    DailyLog = apps.get_model("calories", "DailyLog")
+    DailyNutritionSummary = apps.get_model("calories", "DailyNutritionSummary")
+
+    totais_por_dia = (
+        DailyLog.objects.order_by()
+        .values("user", "date")
+        .annotate(
+            total_calories=Sum("calories"),
+            total_protein=Sum("protein"),
+            total_carbs=Sum("carbs"),
+            total_fat=Sum("fat"),
+            entries_count=Count("id"),
+        )
+    )
+
+    DailyNutritionSummary.objects.bulk_create(
+        [
+            DailyNutritionSummary(
+                user_id=totais.pop("user"), date=totais.pop("date"), **totais
+            )
+            for totais in totais_por_dia
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calories", "0003_dailylog_nutrient_snapshot"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyNutritionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="Dia resumido")),
+                (
+                    "total_calories",
+                    models.IntegerField(default=0, help_text="Calorias do dia"),
+                ),
+                (
+                    "total_protein",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Proteínas do dia (g)",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "total_carbs",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Carboidratos do dia (g)",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "total_fat",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Gorduras do dia (g)",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "entries_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Número de registros no dia"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nutrition_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+                "unique_together": {("user", "date")},
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:13
+
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def preencher_nomes_normalizados(apps, schema_editor):
+    Food = apps.get_model("calories", "Food")
+
+    foods = list(Food.objects.only("id", "name"))
+    for food in foods:
+        sem_acentos = unicodedata.normalize("NFKD", food.name)
+        sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+        food.normalized_name = " ".join(sem_acentos.lower().split())
+
+    Food.objects.bulk_update(foods, ["normalized_name"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calories", "0004_dailynutritionsummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="food",
+            name="normalized_name",
+            field=models.CharField(
+                default="",
+                editable=False,
+                help_text="Nome normalizado (minúsculo e sem acentos) para busca",
+                max_length=100,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="food",
+            index=models.Index(
+                fields=["user", "normalized_name"], name="food_user_normalized_idx"
+            ),
+        ),
+        migrations.RunPython(preencher_nomes_normalizados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calories", "0005_food_normalized_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recipe",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(help_text="Nome da receita", max_length=100)),
+                (
+                    "total_grams",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Peso total da receita",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "calories_per_100g",
+                    models.DecimalField(
+                        decimal_places=4,
+                        default=0,
+                        help_text="Calorias por 100g",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "protein_per_100g",
+                    models.DecimalField(
+                        decimal_places=4,
+                        default=0,
+                        help_text="Proteínas por 100g",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "carbs_per_100g",
+                    models.DecimalField(
+                        decimal_places=4,
+                        default=0,
+                        help_text="Carboidratos por 100g",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "fat_per_100g",
+                    models.DecimalField(
+                        decimal_places=4,
+                        default=0,
+                        help_text="Gorduras por 100g",
+                        max_digits=9,
+                    ),
+                ),
+                (
+                    "food",
+                    models.OneToOneField(
+                        editable=False,
+                        help_text="Alimento que representa a receita no diário",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipe",
+                        to="calories.food",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="RecipeComponent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "quantity_grams",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Quantidade do ingrediente em gramas",
+                        max_digits=7,
+                    ),
+                ),
+                (
+                    "food",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipe_components",
+                        to="calories.food",
+                    ),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="components",
+                        to="calories.recipe",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calories", "0006_recipe"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TDEEEstimate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("origin", models.DateField(help_text="Primeiro dia da série")),
+                ("last_date", models.DateField(help_text="Último dia processado")),
+                (
+                    "trend_kg",
+                    models.FloatField(
+                        blank=True, help_text="Peso suavizado no último dia", null=True
+                    ),
+                ),
+                ("trend_days", models.PositiveIntegerField(default=0)),
+                ("sum_x", models.FloatField(default=0)),
+                ("sum_y", models.FloatField(default=0)),
+                ("sum_xy", models.FloatField(default=0)),
+                ("sum_xx", models.FloatField(default=0)),
+                ("intake_days", models.PositiveIntegerField(default=0)),
+                ("intake_total", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tdee_estimate",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="EnergyBalanceDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="Dia da série")),
+                (
+                    "intake",
+                    models.IntegerField(
+                        blank=True,
+                        help_text="Calorias ingeridas (vazio se sem registro)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "trend_kg",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Peso suavizado (média móvel exponencial)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="energy_balance_days",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "unique_together": {("user", "date")},
+            },
+        ),
+    ]
@@ -1,10 +1,26 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Sum
+from datetime import date, timedelta
 from decimal import Decimal
+import unicodedata
 
+from users.models import DataVersion
+from weight.models import WeightEntry
+
+from .nutrients import NutrientEngine
 
 User = get_user_model()
 
+NUTRIENT_FIELDS = ["calories", "protein", "carbs", "fat"]
+SUMMARY_FIELDS = [
+    "total_calories",
+    "total_protein",
+    "total_carbs",
+    "total_fat",
+    "entries_count",
+]
+
 
 class Food(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="foods")
@@ -22,10 +38,74 @@ class Food(models.Model):
     fat = models.DecimalField(
         max_digits=5, decimal_places=2, help_text="Gorduras por porção (g)"
     )
+    normalized_name = models.CharField(
+        max_length=100,
+        editable=False,
+        default="",
+        help_text="Nome normalizado (minúsculo e sem acentos) para busca",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "normalized_name"], name="food_user_normalized_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.serving_size_grams}g)"
 
+    @staticmethod
+    def normalize_name(name):
+        sem_acentos = unicodedata.normalize("NFKD", name or "")
+        sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+        return " ".join(sem_acentos.lower().split())
+
+    @classmethod
+    def search(cls, user, term="", inicio=0, quantidade=None):
+        foods = cls.objects.filter(user=user).annotate(
+            is_recipe=Exists(Recipe.objects.filter(food=OuterRef("pk")))
+        )
+        term = cls.normalize_name(term)
+        fim = None if quantidade is None else inicio + quantidade
+
+        if not term:
+            return list(
+                foods.annotate(last_used=Max("dailylog__date")).order_by(
+                    F("last_used").desc(nulls_last=True), "normalized_name"
+                )[inicio:fim]
+            )
+
+        prefixo = Q(normalized_name__gte=term, normalized_name__lt=term + "\uffff")
+        por_prefixo = foods.filter(prefixo).order_by("normalized_name")
+        resultado = list(por_prefixo[inicio:fim])
+        if fim is not None and len(resultado) == quantidade:
+            return resultado
+
+        inicio_palavras = max(inicio - por_prefixo.count(), 0) if resultado == [] else 0
+        restante = None if fim is None else quantidade - len(resultado)
+        fim_palavras = None if restante is None else inicio_palavras + restante
+        por_palavra = (
+            foods.filter(normalized_name__contains=f" {term}")
+            .exclude(prefixo)
+            .order_by("normalized_name")
+        )
+        return resultado + list(por_palavra[inicio_palavras:fim_palavras])
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        self.normalized_name = self.normalize_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"normalized_name"}
+        super().save(*args, **kwargs)
+        if adding:
+            return
+        if DailyLog.refresh_nutrients_for_food(self):
+            DailyNutritionSummary.refresh_day(self.user_id, date.today())
+        for recipe in Recipe.objects.filter(components__food=self).distinct():
+            recipe.refresh_nutrients()
+
 
 class DailyLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_logs")
@@ -37,6 +117,27 @@ class DailyLog(models.Model):
     order = models.PositiveIntegerField(
         default=1, help_text="Ordem do alimento na lista do dia"
     )
+    calories = models.IntegerField(
+        default=0, help_text="Calorias consumidas (calculadas no registro)"
+    )
+    protein = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        default=0,
+        help_text="Proteínas consumidas em gramas (calculadas no registro)",
+    )
+    carbs = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        default=0,
+        help_text="Carboidratos consumidos em gramas (calculados no registro)",
+    )
+    fat = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        default=0,
+        help_text="Gorduras consumidas em gramas (calculadas no registro)",
+    )
 
     class Meta:
         ordering = ["order", "id"]
@@ -44,6 +145,37 @@ class DailyLog(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.food.name} em {self.date}"
 
+    def save(self, *args, **kwargs):
+        self.refresh_nutrients()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | set(NUTRIENT_FIELDS)
+        super().save(*args, **kwargs)
+
+    def refresh_nutrients(self):
+        self.quantity_grams = self._meta.get_field("quantity_grams").to_python(
+            self.quantity_grams
+        )
+        self.calories, self.protein, self.carbs, self.fat = self.nutrient_values
+
+    @classmethod
+    def refresh_nutrients_for_food(cls, food, log_date=None):
+        logs = list(cls.objects.filter(food=food, date=log_date or date.today()))
+        for log in logs:
+            log.food = food
+            log.refresh_nutrients()
+        cls.objects.bulk_update(logs, NUTRIENT_FIELDS)
+        return logs
+
+    @property
+    def nutrient_values(self):
+        chave = (NutrientEngine.chave_alimento(self.food), self.quantity_grams)
+        cache = getattr(self, "_nutrient_cache", None)
+        if cache is None or cache[0] != chave:
+            cache = (chave, NutrientEngine.calcular(*chave))
+            self._nutrient_cache = cache
+        return cache[1]
+
     @property
     def nutritional_factor(self):
         return (
@@ -52,22 +184,420 @@ class DailyLog(models.Model):
             else Decimal(0)
         )
 
-    def _calcular_nutriente(self, valor_nutriente, usar_decimal=True):
-        resultado = valor_nutriente * self.nutritional_factor
-        return resultado.quantize(Decimal("0.01")) if usar_decimal else round(resultado)
-
     @property
     def calculated_calories(self):
-        return self._calcular_nutriente(self.food.calories, usar_decimal=False)
+        return self.nutrient_values[0]
 
     @property
     def calculated_protein(self):
-        return self._calcular_nutriente(self.food.protein)
+        return self.nutrient_values[1]
 
     @property
     def calculated_carbs(self):
-        return self._calcular_nutriente(self.food.carbs)
+        return self.nutrient_values[2]
 
     @property
     def calculated_fat(self):
-        return self._calcular_nutriente(self.food.fat)
+        return self.nutrient_values[3]
+
+
+class DailyNutritionSummary(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="nutrition_summaries"
+    )
+    date = models.DateField(help_text="Dia resumido")
+    total_calories = models.IntegerField(default=0, help_text="Calorias do dia")
+    total_protein = models.DecimalField(
+        max_digits=9, decimal_places=2, default=0, help_text="Proteínas do dia (g)"
+    )
+    total_carbs = models.DecimalField(
+        max_digits=9, decimal_places=2, default=0, help_text="Carboidratos do dia (g)"
+    )
+    total_fat = models.DecimalField(
+        max_digits=9, decimal_places=2, default=0, help_text="Gorduras do dia (g)"
+    )
+    entries_count = models.PositiveIntegerField(
+        default=0, help_text="Número de registros no dia"
+    )
+
+    class Meta:
+        ordering = ["-date"]
+        unique_together = ["user", "date"]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total_calories} kcal em {self.date}"
+
+    @staticmethod
+    def totals_aggregates():
+        return {
+            "total_calories": Sum("calories"),
+            "total_protein": Sum("protein"),
+            "total_carbs": Sum("carbs"),
+            "total_fat": Sum("fat"),
+            "entries_count": Count("id"),
+        }
+
+    @classmethod
+    def empty_totals(cls):
+        return {campo: 0 for campo in SUMMARY_FIELDS}
+
+    @classmethod
+    def get_totals(cls, user, log_date):
+        totals = (
+            cls.objects.filter(user=user, date=log_date).values(*SUMMARY_FIELDS).first()
+        )
+        return totals or cls.empty_totals()
+
+    @classmethod
+    def refresh_day(cls, user, log_date):
+        DataVersion.bump(user, "daily_log")
+        totals = DailyLog.objects.filter(user=user, date=log_date).aggregate(
+            **cls.totals_aggregates()
+        )
+
+        if not totals["entries_count"]:
+            cls.objects.filter(user=user, date=log_date).delete()
+            TDEEEstimate.register_day(user, log_date)
+            return None
+
+        summary, _ = cls.objects.update_or_create(
+            user_id=getattr(user, "pk", user),
+            date=log_date,
+            defaults={campo: valor or 0 for campo, valor in totals.items()},
+        )
+        TDEEEstimate.register_day(user, log_date)
+        return summary
+
+
+class Recipe(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipes")
+    name = models.CharField(max_length=100, help_text="Nome da receita")
+    food = models.OneToOneField(
+        Food,
+        on_delete=models.CASCADE,
+        related_name="recipe",
+        editable=False,
+        help_text="Alimento que representa a receita no diário",
+    )
+    total_grams = models.DecimalField(
+        max_digits=9, decimal_places=2, default=0, help_text="Peso total da receita"
+    )
+    calories_per_100g = models.DecimalField(
+        max_digits=9, decimal_places=4, default=0, help_text="Calorias por 100g"
+    )
+    protein_per_100g = models.DecimalField(
+        max_digits=9, decimal_places=4, default=0, help_text="Proteínas por 100g"
+    )
+    carbs_per_100g = models.DecimalField(
+        max_digits=9, decimal_places=4, default=0, help_text="Carboidratos por 100g"
+    )
+    fat_per_100g = models.DecimalField(
+        max_digits=9, decimal_places=4, default=0, help_text="Gorduras por 100g"
+    )
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if not self.food_id:
+            self.food = Food.objects.create(
+                user=self.user,
+                name=self.name,
+                serving_size_grams=100,
+                calories=0,
+                protein=0,
+                carbs=0,
+                fat=0,
+            )
+        super().save(*args, **kwargs)
+
+    def set_components(self, itens):
+        self.components.all().delete()
+        RecipeComponent.objects.bulk_create(
+            [
+                RecipeComponent(recipe=self, food=food, quantity_grams=quantidade)
+                for food, quantidade in itens
+            ]
+        )
+        self.refresh_nutrients()
+
+    def refresh_nutrients(self):
+        componentes = list(self.components.select_related("food"))
+        total_grams = sum((c.quantity_grams for c in componentes), Decimal(0))
+
+        totais = dict.fromkeys(NUTRIENT_FIELDS, Decimal(0))
+        for componente in componentes:
+            food = componente.food
+            if food.serving_size_grams <= 0:
+                continue
+            fator = componente.quantity_grams / food.serving_size_grams
+            for campo in NUTRIENT_FIELDS:
+                totais[campo] += Decimal(getattr(food, campo)) * fator
+
+        fator_100g = Decimal(100) / total_grams if total_grams > 0 else Decimal(0)
+        self.total_grams = total_grams
+        for campo in NUTRIENT_FIELDS:
+            setattr(
+                self,
+                f"{campo}_per_100g",
+                (totais[campo] * fator_100g).quantize(Decimal("0.0001")),
+            )
+        self.save()
+
+        self.food.name = self.name
+        self.food.serving_size_grams = Decimal(100)
+        self.food.calories = round(self.calories_per_100g)
+        self.food.protein = self.protein_per_100g.quantize(Decimal("0.01"))
+        self.food.carbs = self.carbs_per_100g.quantize(Decimal("0.01"))
+        self.food.fat = self.fat_per_100g.quantize(Decimal("0.01"))
+        self.food.save()
+
+
+class RecipeComponent(models.Model):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="components"
+    )
+    food = models.ForeignKey(
+        Food, on_delete=models.CASCADE, related_name="recipe_components"
+    )
+    quantity_grams = models.DecimalField(
+        max_digits=7, decimal_places=2, help_text="Quantidade do ingrediente em gramas"
+    )
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.recipe.name} - {self.food.name} ({self.quantity_grams}g)"
+
+
+class EnergyBalanceDay(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="energy_balance_days"
+    )
+    date = models.DateField(help_text="Dia da série")
+    intake = models.IntegerField(
+        null=True, blank=True, help_text="Calorias ingeridas (vazio se sem registro)"
+    )
+    trend_kg = models.FloatField(
+        null=True, blank=True, help_text="Peso suavizado (média móvel exponencial)"
+    )
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ["user", "date"]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+
+class TDEEEstimate(models.Model):
+    WINDOW_DAYS = 28
+    TREND_ALPHA = 0.1
+    KCAL_PER_KG = 7700
+    MIN_DAYS = 10
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, related_name="tdee_estimate"
+    )
+    origin = models.DateField(help_text="Primeiro dia da série")
+    last_date = models.DateField(help_text="Último dia processado")
+    trend_kg = models.FloatField(
+        null=True, blank=True, help_text="Peso suavizado no último dia"
+    )
+    trend_days = models.PositiveIntegerField(default=0)
+    sum_x = models.FloatField(default=0)
+    sum_y = models.FloatField(default=0)
+    sum_xy = models.FloatField(default=0)
+    sum_xx = models.FloatField(default=0)
+    intake_days = models.PositiveIntegerField(default=0)
+    intake_total = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - TDEE até {self.last_date}"
+
+    @classmethod
+    def smooth(cls, weights, trend=None):
+        trends = []
+        for weight in weights:
+            if weight is not None:
+                trend = (
+                    weight
+                    if trend is None
+                    else trend + cls.TREND_ALPHA * (weight - trend)
+                )
+            trends.append(trend)
+        return trends
+
+    @staticmethod
+    def load_series(user, start=None, end=None):
+        filtros = {"user": user}
+        if start:
+            filtros["date__gte"] = start
+        if end:
+            filtros["date__lte"] = end
+
+        intake = dict(
+            DailyNutritionSummary.objects.filter(**filtros).values_list(
+                "date", "total_calories"
+            )
+        )
+        weights = {
+            data: float(peso)
+            for data, peso in WeightEntry.objects.filter(**filtros).values_list(
+                "date", "weight_kg"
+            )
+        }
+        return intake, weights
+
+    @classmethod
+    def build_days(cls, user_id, start, end, intake, weights, trend=None):
+        datas = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        trends = cls.smooth([weights.get(data) for data in datas], trend)
+        return [
+            EnergyBalanceDay(
+                user_id=user_id, date=data, intake=intake.get(data), trend_kg=tendencia
+            )
+            for data, tendencia in zip(datas, trends)
+        ]
+
+    def window_start(self, last_date=None):
+        return (last_date or self.last_date) - timedelta(days=self.WINDOW_DAYS - 1)
+
+    def _accumulate(self, day, sign=1):
+        if day.trend_kg is not None:
+            x = (day.date - self.origin).days
+            self.trend_days += sign
+            self.sum_x += sign * x
+            self.sum_y += sign * day.trend_kg
+            self.sum_xy += sign * x * day.trend_kg
+            self.sum_xx += sign * x * x
+        if day.intake is not None:
+            self.intake_days += sign
+            self.intake_total += sign * day.intake
+
+    @classmethod
+    def rebuild(cls, user):
+        user_id = getattr(user, "pk", user)
+        intake, weights = cls.load_series(user_id)
+        datas = set(intake) | set(weights)
+
+        with transaction.atomic():
+            EnergyBalanceDay.objects.filter(user_id=user_id).delete()
+            cls.objects.filter(user_id=user_id).delete()
+            if not datas:
+                return None
+
+            estimate = cls(user_id=user_id, origin=min(datas), last_date=max(datas))
+            dias = cls.build_days(
+                user_id, estimate.origin, estimate.last_date, intake, weights
+            )
+            EnergyBalanceDay.objects.bulk_create(dias, batch_size=500)
+
+            inicio_janela = estimate.window_start()
+            for dia in dias:
+                if dia.date >= inicio_janela:
+                    estimate._accumulate(dia)
+            estimate.trend_kg = dias[-1].trend_kg
+            estimate.save()
+        return estimate
+
+    @classmethod
+    def register_day(cls, user, log_date):
+        user_id = getattr(user, "pk", user)
+        with transaction.atomic():
+            estimate = cls.objects.select_for_update().filter(user_id=user_id).first()
+            if estimate is None:
+                return None
+            if log_date < estimate.last_date:
+                estimate.delete()
+                return None
+
+            if log_date == estimate.last_date:
+                inicio = log_date
+                tendencia_anterior = (
+                    EnergyBalanceDay.objects.filter(
+                        user_id=user_id, date=log_date - timedelta(days=1)
+                    )
+                    .values_list("trend_kg", flat=True)
+                    .first()
+                )
+            else:
+                inicio = estimate.last_date + timedelta(days=1)
+                tendencia_anterior = estimate.trend_kg
+
+            inicio_janela = estimate.window_start(log_date)
+            saindo = EnergyBalanceDay.objects.filter(
+                user_id=user_id, date__gte=estimate.window_start()
+            ).filter(Q(date__lt=inicio_janela) | Q(date__gte=inicio))
+            for dia in saindo:
+                estimate._accumulate(dia, sign=-1)
+
+            intake, weights = cls.load_series(user_id, inicio, log_date)
+            dias = cls.build_days(
+                user_id, inicio, log_date, intake, weights, tendencia_anterior
+            )
+            EnergyBalanceDay.objects.filter(user_id=user_id, date__gte=inicio).delete()
+            EnergyBalanceDay.objects.bulk_create(dias, batch_size=500)
+            for dia in dias:
+                if dia.date >= inicio_janela:
+                    estimate._accumulate(dia)
+
+            estimate.last_date = log_date
+            estimate.trend_kg = dias[-1].trend_kg
+            estimate.save()
+        return estimate
+
+    @classmethod
+    def for_user(cls, user):
+        estimate = cls.objects.filter(user=user).first()
+        if estimate is None:
+            estimate = cls.rebuild(user)
+        if estimate is None:
+            return cls.empty_result()
+        return estimate.result()
+
+    @classmethod
+    def empty_result(cls):
+        return {
+            "tdee": None,
+            "average_intake": None,
+            "weekly_change_kg": None,
+            "trend_weight": None,
+            "intake_days": 0,
+            "weight_days": 0,
+            "window_days": cls.WINDOW_DAYS,
+            "last_date": None,
+        }
+
+    def result(self):
+        resultado = self.empty_result()
+        resultado.update(
+            {
+                "trend_weight": (
+                    round(self.trend_kg, 1) if self.trend_kg is not None else None
+                ),
+                "intake_days": self.intake_days,
+                "weight_days": self.trend_days,
+                "last_date": self.last_date.isoformat(),
+            }
+        )
+
+        n = self.trend_days
+        denominador = n * self.sum_xx - self.sum_x**2
+        if n < self.MIN_DAYS or self.intake_days < self.MIN_DAYS or denominador <= 0:
+            return resultado
+
+        inclinacao = (n * self.sum_xy - self.sum_x * self.sum_y) / denominador
+        consumo_medio = self.intake_total / self.intake_days
+        resultado.update(
+            {
+                "tdee": round(consumo_medio - inclinacao * self.KCAL_PER_KG),
+                "average_intake": round(consumo_medio),
+                "weekly_change_kg": round(inclinacao * 7, 2),
+            }
+        )
+        return resultado
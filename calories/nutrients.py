@@ -0,0 +1,103 @@
+from decimal import Decimal
+from functools import lru_cache
+from math import lcm
+
+CENTESIMO = Decimal("0.01")
+CENTESIMOS_POR_UNIDADE = 100
+ZERO = (0, Decimal("0.00"), Decimal("0.00"), Decimal("0.00"))
+
+
+def _fracao(valor):
+    if isinstance(valor, Decimal):
+        return valor.as_integer_ratio()
+    return Decimal(valor).as_integer_ratio()
+
+
+class NutrientEngine:
+
+    @staticmethod
+    def chave_alimento(food):
+        recipe = getattr(food, "recipe", None)
+        if recipe is not None:
+            return (
+                Decimal(100),
+                recipe.calories_per_100g,
+                recipe.protein_per_100g,
+                recipe.carbs_per_100g,
+                recipe.fat_per_100g,
+            )
+        return (
+            food.serving_size_grams,
+            food.calories,
+            food.protein,
+            food.carbs,
+            food.fat,
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def vetor_alimento(chave):
+        porcao, *valores = chave
+        porcao_num, porcao_den = _fracao(porcao)
+        if porcao_num <= 0:
+            return None
+
+        fracoes = [_fracao(valor) for valor in valores]
+        comum = lcm(*(den for _, den in fracoes))
+        escalas = [1] + [CENTESIMOS_POR_UNIDADE] * (len(fracoes) - 1)
+        numeradores = tuple(
+            num * porcao_den * (comum // den) * escala
+            for (num, den), escala in zip(fracoes, escalas)
+        )
+        return numeradores, comum * porcao_num
+
+    @staticmethod
+    def calcular_decimal(valor, quantidade, porcao, inteiro=False):
+        fator = quantidade / porcao if porcao > 0 else Decimal(0)
+        resultado = valor * fator
+        return round(resultado) if inteiro else resultado.quantize(CENTESIMO)
+
+    @classmethod
+    def calcular(cls, chave, quantidade):
+        return cls._aplicar(cls.vetor_alimento(chave), chave, quantidade)
+
+    @classmethod
+    def calcular_lote(cls, itens):
+        return [
+            cls.calcular(cls.chave_alimento(food), quantidade)
+            for food, quantidade in itens
+        ]
+
+    @classmethod
+    def _aplicar(cls, vetor, chave, quantidade):
+        if vetor is None:
+            return ZERO
+
+        numeradores, denominador = vetor
+        quantidade_num, quantidade_den = _fracao(quantidade)
+        denominador *= quantidade_den
+
+        resultado = []
+        for indice, numerador in enumerate(numeradores):
+            valor, resto = divmod(numerador * quantidade_num, denominador)
+            dobro = resto * 2
+            if dobro == denominador:
+                resultado.append(cls._desempatar(chave, indice, quantidade))
+                continue
+            if dobro > denominador:
+                valor += 1
+            resultado.append(valor if indice == 0 else Decimal(valor).scaleb(-2))
+        return tuple(resultado)
+
+    @classmethod
+    def _desempatar(cls, chave, indice, quantidade):
+        # Num empate exato o resultado em Decimal depende de como o fator
+        # quantidade/porção foi arredondado para 28 dígitos, então só nesse
+        # caso o cálculo original é refeito.
+        porcao, *valores = chave
+        return cls.calcular_decimal(
+            Decimal(valores[indice]),
+            Decimal(quantidade),
+            Decimal(porcao),
+            inteiro=indice == 0,
+        )
@@ -0,0 +1,140 @@
+import random
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from .models import DailyLog, Food
+from .nutrients import NutrientEngine
+
+CENTESIMO = Decimal("0.01")
+
+
+def calcular_referencia(food, quantidade):
+    fator = (
+        quantidade / food.serving_size_grams
+        if food.serving_size_grams > 0
+        else Decimal(0)
+    )
+    return (
+        round(food.calories * fator),
+        (food.protein * fator).quantize(CENTESIMO),
+        (food.carbs * fator).quantize(CENTESIMO),
+        (food.fat * fator).quantize(CENTESIMO),
+    )
+
+
+def criar_alimento(porcao, calorias=0, proteina="0", carboidratos="0", gordura="0"):
+    return Food(
+        name="Alimento",
+        serving_size_grams=Decimal(porcao),
+        calories=calorias,
+        protein=Decimal(proteina),
+        carbs=Decimal(carboidratos),
+        fat=Decimal(gordura),
+    )
+
+
+class NutrientEngineRoundingTests(SimpleTestCase):
+    def assert_igual_referencia(self, food, quantidade):
+        esperado = calcular_referencia(food, quantidade)
+        obtido = NutrientEngine.calcular(
+            NutrientEngine.chave_alimento(food), quantidade
+        )
+        self.assertEqual(obtido, esperado)
+        self.assertEqual([str(valor) for valor in obtido], list(map(str, esperado)))
+
+    @staticmethod
+    def centesimos(gerador, maximo):
+        return Decimal(gerador.randint(0, maximo * 100)).scaleb(-2)
+
+    def test_random_values_match_decimal_reference(self):
+        gerador = random.Random(2024)
+        for _ in range(5000):
+            food = criar_alimento(
+                self.centesimos(gerador, 500) or "0.01",
+                gerador.randint(0, 900),
+                self.centesimos(gerador, 100),
+                self.centesimos(gerador, 100),
+                self.centesimos(gerador, 100),
+            )
+            quantidade = self.centesimos(gerador, 10000)
+            with self.subTest(food=NutrientEngine.chave_alimento(food), q=quantidade):
+                self.assert_igual_referencia(food, quantidade)
+
+    def test_exact_half_boundaries_match_decimal_reference(self):
+        for porcao in ["2", "4", "8", "0.02", "0.04", "200", "400"]:
+            for numerador in range(1, 40, 2):
+                food = criar_alimento(
+                    porcao,
+                    numerador,
+                    Decimal(numerador).scaleb(-2),
+                    Decimal(numerador).scaleb(-1),
+                    Decimal(numerador),
+                )
+                for quantidade in ["1", "0.5", "0.01", "0.03", "1.25", "3", "100"]:
+                    with self.subTest(porcao=porcao, n=numerador, q=quantidade):
+                        self.assert_igual_referencia(food, Decimal(quantidade))
+
+    def test_repeating_factors_match_decimal_reference(self):
+        for porcao in ["3", "7", "0.03", "0.07", "333.33", "999.99"]:
+            food = criar_alimento(porcao, 899, "99.99", "45.45", "0.01")
+            for quantidade in ["1", "1.5", "4.5", "10.01", "99999.99"]:
+                with self.subTest(porcao=porcao, q=quantidade):
+                    self.assert_igual_referencia(food, Decimal(quantidade))
+
+    def test_zero_quantity_and_serving(self):
+        food = criar_alimento("100", 250, "10.50", "30.25", "8.75")
+        self.assert_igual_referencia(food, Decimal("0"))
+        self.assert_igual_referencia(food, Decimal("0.00"))
+
+        sem_porcao = criar_alimento("0", 250, "10.50", "30.25", "8.75")
+        self.assert_igual_referencia(sem_porcao, Decimal("50"))
+
+    def test_missing_quantity_fails_like_decimal_reference(self):
+        food = criar_alimento("100", 250, "10.50", "30.25", "8.75")
+        with self.assertRaises(TypeError):
+            calcular_referencia(food, None)
+        with self.assertRaises(TypeError):
+            NutrientEngine.calcular(NutrientEngine.chave_alimento(food), None)
+
+    def test_batch_and_daily_log_properties_match_reference(self):
+        gerador = random.Random(7)
+        logs = [
+            DailyLog(
+                food=criar_alimento(
+                    self.centesimos(gerador, 300) or "1",
+                    gerador.randint(0, 900),
+                    self.centesimos(gerador, 50),
+                    self.centesimos(gerador, 50),
+                    self.centesimos(gerador, 50),
+                ),
+                quantity_grams=self.centesimos(gerador, 1000),
+            )
+            for _ in range(200)
+        ]
+
+        lote = NutrientEngine.calcular_lote(
+            [(log.food, log.quantity_grams) for log in logs]
+        )
+        for log, resultado in zip(logs, lote):
+            esperado = calcular_referencia(log.food, log.quantity_grams)
+            self.assertEqual(resultado, esperado)
+            self.assertEqual(
+                (
+                    log.calculated_calories,
+                    log.calculated_protein,
+                    log.calculated_carbs,
+                    log.calculated_fat,
+                ),
+                esperado,
+            )
+
+    def test_cached_values_follow_quantity_changes(self):
+        log = DailyLog(
+            food=criar_alimento("100", 200, "10", "20", "5"),
+            quantity_grams=Decimal("50"),
+        )
+        self.assertEqual(log.calculated_calories, 100)
+        log.quantity_grams = Decimal("150")
+        self.assertEqual(log.calculated_calories, 300)
+        self.assertEqual(log.calculated_fat, Decimal("7.50"))
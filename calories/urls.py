@@ -5,6 +5,10 @@ app_name = "calories"
 
 urlpatterns = [
     path("log/", views.DailyLogView.as_view(), name="daily_log"),
+    path("log/batch/", views.DailyLogBatchView.as_view(), name="daily_log_batch"),
+    path("log/clone/", views.DailyLogCloneView.as_view(), name="daily_log_clone"),
+    path("report/", views.NutritionReportView.as_view(), name="nutrition_report"),
+    path("tdee/", views.TDEEView.as_view(), name="tdee"),
     path(
         "log/<int:pk>/delete/",
         views.DailyLogDeleteView.as_view(),
@@ -12,6 +16,13 @@ urlpatterns = [
     ),
     path("log/<int:pk>/edit/", views.DailyLogEditView.as_view(), name="daily_log_edit"),
     path("foods/add/", views.FoodCreateView.as_view(), name="food_add"),
+    path("foods/search/", views.FoodSearchView.as_view(), name="food_search"),
+    path("foods/import/", views.FoodImportView.as_view(), name="food_import"),
+    path(
+        "recipes/add-ajax/",
+        views.RecipeCreateAjaxView.as_view(),
+        name="recipe_add_ajax",
+    ),
     path("foods/add-ajax/", views.FoodCreateAjaxView.as_view(), name="food_add_ajax"),
     path("foods/<int:pk>/edit/", views.FoodUpdateView.as_view(), name="food_edit"),
     path(
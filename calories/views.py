@@ -1,12 +1,16 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.views import View
-from django.db import models
-from datetime import date
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from datetime import date, timedelta
 
-from .models import Food, DailyLog
+from .models import Food, DailyLog, DailyNutritionSummary, Recipe, TDEEEstimate
 from .forms import FoodForm, DailyLogForm
+from .importers import FoodImporter
+from shared.timeseries import TimeSeriesUtils
 from shared.utils import (
     AjaxFormProcessorMixin,
     BaseUserCreateView,
@@ -14,6 +18,9 @@ from shared.utils import (
     BaseUserDeleteView,
     ReorderMixin,
     AjaxCRUDMixin,
+    ContextDataMixin,
+    JsonResponseHelper,
+    VersionedETagMixin,
 )
 
 
@@ -35,6 +42,9 @@ class FoodUpdateView(BaseUserUpdateView):
     template_name = "calories/food_form.html"
     success_url = reverse_lazy("calories:daily_log")
 
+    def get_queryset(self):
+        return super().get_queryset().filter(recipe__isnull=True)
+
     def get_mensagem_sucesso_atualizacao(self):
         if hasattr(self, "object") and self.object and hasattr(self.object, "name"):
             return f'Alimento "{self.object.name}" atualizado com sucesso!'
@@ -49,6 +59,23 @@ class FoodDeleteView(BaseUserDeleteView):
     def get_mensagem_sucesso_exclusao(self):
         return f"Alimento excluído com sucesso!"
 
+    def form_valid(self, form):
+        datas_afetadas = list(
+            DailyLog.objects.filter(food=self.object)
+            .values_list("date", flat=True)
+            .distinct()
+        )
+        receitas_afetadas = list(
+            Recipe.objects.filter(components__food=self.object).distinct()
+        )
+        with transaction.atomic():
+            response = super().form_valid(form)
+            for data in datas_afetadas:
+                DailyNutritionSummary.refresh_day(self.request.user, data)
+            for receita in receitas_afetadas:
+                receita.refresh_nutrients()
+        return response
+
     def get_success_url(self):
         next_url = self.request.POST.get("next")
         if next_url:
@@ -58,13 +85,75 @@ class FoodDeleteView(BaseUserDeleteView):
 
 class DailyLogUtils:
     @staticmethod
-    def calcular_totais_nutricionais(daily_logs):
-        return {
-            "total_calories": sum(log.calculated_calories for log in daily_logs),
-            "total_protein": sum(log.calculated_protein for log in daily_logs),
-            "total_carbs": sum(log.calculated_carbs for log in daily_logs),
-            "total_fat": sum(log.calculated_fat for log in daily_logs),
-        }
+    def calcular_totais_nutricionais(usuario, data):
+        return DailyNutritionSummary.get_totals(usuario, data)
+
+    @staticmethod
+    def obter_ultima_ordem(usuario, data):
+        return (
+            DailyLog.objects.filter(user=usuario, date=data).aggregate(
+                models.Max("order")
+            )["order__max"]
+            or 0
+        )
+
+    @staticmethod
+    def validar_itens(usuario, food_ids, quantidades):
+        if not food_ids:
+            return None, "Nenhum alimento fornecido"
+        if len(food_ids) != len(quantidades):
+            return None, "Cada alimento deve ter uma quantidade correspondente"
+
+        try:
+            food_ids = [int(food_id) for food_id in food_ids]
+        except ValueError:
+            return None, "ID de alimento inválido"
+        foods = (
+            Food.objects.filter(user=usuario)
+            .select_related("recipe")
+            .in_bulk(set(food_ids))
+        )
+
+        campo_quantidade = DailyLogForm.base_fields["quantity_grams"]
+        itens = []
+        for food_id, quantidade in zip(food_ids, quantidades):
+            food = foods.get(food_id)
+            if food is None:
+                return (
+                    None,
+                    f"Alimento com ID {food_id} não encontrado ou sem permissão",
+                )
+            try:
+                quantidade = campo_quantidade.clean(quantidade)
+            except ValidationError as e:
+                return None, (
+                    f'Quantidade inválida para "{food.name}": {" ".join(e.messages)}'
+                )
+            if quantidade <= 0:
+                return None, f'Quantidade deve ser positiva para "{food.name}"'
+            itens.append((food, quantidade))
+
+        return itens, None
+
+    @staticmethod
+    def inserir_registros(usuario, itens):
+        today = date.today()
+
+        with transaction.atomic():
+            ultima_ordem = DailyLogUtils.obter_ultima_ordem(usuario, today)
+
+            registros = []
+            for ordem, (food, quantidade) in enumerate(itens, ultima_ordem + 1):
+                registro = DailyLog(
+                    user=usuario, food=food, quantity_grams=quantidade, order=ordem
+                )
+                registro.refresh_nutrients()
+                registros.append(registro)
+
+            DailyLog.objects.bulk_create(registros)
+            DailyNutritionSummary.refresh_day(usuario, today)
+
+        return registros
 
 
 class DailyLogView(LoginRequiredMixin, View):
@@ -72,15 +161,21 @@ class DailyLogView(LoginRequiredMixin, View):
 
     def _get_daily_context(self, form=None):
         today = date.today()
-        daily_logs = DailyLog.objects.filter(user=self.request.user, date=today)
-        user_foods = Food.objects.filter(user=self.request.user).order_by("name")
+        daily_logs = DailyLog.objects.filter(
+            user=self.request.user, date=today
+        ).select_related("food")
+        tamanho_pagina = FoodSearchView.TAMANHO_PAGINA
+        user_foods = Food.search(self.request.user, quantidade=tamanho_pagina + 1)
 
         context = {
             "date": today,
             "daily_logs": daily_logs,
-            "user_foods": user_foods,
+            "user_foods": user_foods[:tamanho_pagina],
+            "has_more_foods": len(user_foods) > tamanho_pagina,
         }
-        context.update(DailyLogUtils.calcular_totais_nutricionais(daily_logs))
+        context.update(
+            DailyLogUtils.calcular_totais_nutricionais(self.request.user, today)
+        )
 
         if form:
             context["form"] = form
@@ -97,20 +192,61 @@ class DailyLogView(LoginRequiredMixin, View):
             log_entry.user = request.user
 
             today = date.today()
-            last_order = (
-                DailyLog.objects.filter(user=request.user, date=today).aggregate(
-                    models.Max("order")
-                )["order__max"]
-                or 0
-            )
-            log_entry.order = last_order + 1
-            log_entry.save()
+            log_entry.order = DailyLogUtils.obter_ultima_ordem(request.user, today) + 1
+
+            with transaction.atomic():
+                log_entry.save()
+                DailyNutritionSummary.refresh_day(request.user, today)
             return redirect("calories:daily_log")
 
         context = self._get_daily_context(form)
         return render(request, self.template_name, context)
 
 
+class DailyLogBatchView(LoginRequiredMixin, View):
+    def post(self, request):
+        itens, erro = DailyLogUtils.validar_itens(
+            request.user,
+            request.POST.getlist("food_ids[]"),
+            request.POST.getlist("quantities[]"),
+        )
+        if erro:
+            return JsonResponseHelper.erro(erro)
+
+        registros = DailyLogUtils.inserir_registros(request.user, itens)
+        return JsonResponseHelper.sucesso({"created": len(registros)})
+
+
+class DailyLogCloneView(LoginRequiredMixin, View):
+    def post(self, request):
+        today = date.today()
+        try:
+            data_origem = request.POST.get("date")
+            data_origem = (
+                date.fromisoformat(data_origem)
+                if data_origem
+                else today - timedelta(days=1)
+            )
+        except ValueError:
+            return JsonResponseHelper.erro("Data inválida")
+
+        if data_origem == today:
+            return JsonResponseHelper.erro("Escolha um dia diferente de hoje")
+
+        registros_origem = DailyLog.objects.filter(
+            user=request.user, date=data_origem
+        ).select_related("food__recipe")
+        itens = [(log.food, log.quantity_grams) for log in registros_origem]
+
+        if not itens:
+            return JsonResponseHelper.erro(
+                f'Nenhum alimento registrado em {data_origem.strftime("%d/%m/%Y")}'
+            )
+
+        registros = DailyLogUtils.inserir_registros(request.user, itens)
+        return JsonResponseHelper.sucesso({"created": len(registros)})
+
+
 class DailyLogDeleteView(BaseUserDeleteView):
     model = DailyLog
     template_name = "calories/daily_log_confirm_delete.html"
@@ -119,12 +255,23 @@ class DailyLogDeleteView(BaseUserDeleteView):
     def get_mensagem_sucesso_exclusao(self):
         return "Registro do diário excluído com sucesso!"
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            DailyNutritionSummary.refresh_day(self.object.user_id, self.object.date)
+        return response
+
 
 class DailyLogEditView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        return AjaxFormProcessorMixin.processar_edicao_ajax(
-            DailyLog, pk, request.user, request.POST, ["quantity_grams"]
-        )
+        with transaction.atomic():
+            response = AjaxFormProcessorMixin.processar_edicao_ajax(
+                DailyLog, pk, request.user, request.POST, ["quantity_grams"]
+            )
+            if response.status_code == 200:
+                log = DailyLog.objects.only("date").get(pk=pk)
+                DailyNutritionSummary.refresh_day(request.user, log.date)
+        return response
 
 
 class FoodCreateAjaxView(AjaxCRUDMixin, LoginRequiredMixin, View):
@@ -140,6 +287,101 @@ class FoodUpdateAjaxView(AjaxCRUDMixin, LoginRequiredMixin, View):
         return self.processar_update_ajax(Food, pk, FoodForm)
 
 
+class FoodSearchView(LoginRequiredMixin, View):
+    TAMANHO_PAGINA = 20
+
+    @staticmethod
+    def _serializar_alimento(food):
+        return {
+            "id": food.id,
+            "name": food.name,
+            "serving_size_grams": f"{food.serving_size_grams:.2f}",
+            "calories": food.calories,
+            "protein": f"{food.protein:.2f}",
+            "carbs": f"{food.carbs:.2f}",
+            "fat": f"{food.fat:.2f}",
+            "is_recipe": food.is_recipe,
+        }
+
+    def get(self, request):
+        try:
+            pagina = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            return JsonResponseHelper.erro("Página inválida")
+
+        inicio = (pagina - 1) * self.TAMANHO_PAGINA
+        foods = Food.search(
+            request.user,
+            request.GET.get("q", ""),
+            inicio=inicio,
+            quantidade=self.TAMANHO_PAGINA + 1,
+        )
+
+        return JsonResponseHelper.sucesso(
+            {
+                "foods": [
+                    self._serializar_alimento(food)
+                    for food in foods[: self.TAMANHO_PAGINA]
+                ],
+                "page": pagina,
+                "has_next": len(foods) > self.TAMANHO_PAGINA,
+            }
+        )
+
+
+class FoodImportView(LoginRequiredMixin, View):
+    def post(self, request):
+        arquivo = request.FILES.get("arquivo")
+        if not arquivo:
+            return JsonResponseHelper.erro("Arquivo não fornecido")
+
+        formato = request.POST.get("formato") or FoodImporter.detectar_formato(
+            arquivo.name
+        )
+        if formato not in ("csv", "json"):
+            return JsonResponseHelper.erro("Formato inválido")
+
+        importador = FoodImporter(request.user)
+        try:
+            resultado = importador.importar(arquivo, formato)
+        except ValueError as e:
+            return JsonResponseHelper.erro(
+                f"Arquivo inválido: {e}", dados_extras=importador.resultado()
+            )
+
+        return JsonResponseHelper.sucesso(resultado)
+
+
+class RecipeCreateAjaxView(LoginRequiredMixin, View):
+    def post(self, request):
+        nome = request.POST.get("name", "").strip()
+        if len(nome) < 2:
+            return JsonResponseHelper.erro("Nome deve ter pelo menos 2 caracteres.")
+
+        itens, erro = DailyLogUtils.validar_itens(
+            request.user,
+            request.POST.getlist("food_ids[]"),
+            request.POST.getlist("quantities[]"),
+        )
+        if erro:
+            return JsonResponseHelper.erro(erro)
+        if Recipe.objects.filter(food__in=[food for food, _ in itens]).exists():
+            return JsonResponseHelper.erro(
+                "Receitas não podem ser usadas como ingrediente"
+            )
+
+        with transaction.atomic():
+            recipe = Recipe.objects.create(user=request.user, name=nome)
+            recipe.set_components(itens)
+
+        return JsonResponseHelper.sucesso(
+            {
+                "message": f'Receita "{recipe.name}" criada com sucesso!',
+                "food_id": recipe.food_id,
+            }
+        )
+
+
 class ReorderDailyLogsView(ReorderMixin, LoginRequiredMixin, View):
     def post(self, request):
         food_ids = request.POST.getlist("food_ids[]")
@@ -148,3 +390,62 @@ class ReorderDailyLogsView(ReorderMixin, LoginRequiredMixin, View):
         return self.processar_reordenacao(
             DailyLog, food_ids, campo_filtro="user", filtros_extras={"date": today}
         )
+
+
+class NutritionReportView(
+    VersionedETagMixin, ContextDataMixin, LoginRequiredMixin, View
+):
+    datasets_versionados = ["daily_log"]
+    MAXIMO_DIAS = 3650
+
+    def _obter_periodo(self, request):
+        fim = request.GET.get("end")
+        fim = date.fromisoformat(fim) if fim else date.today()
+
+        inicio = request.GET.get("start")
+        if inicio:
+            inicio = date.fromisoformat(inicio)
+        else:
+            dias = int(request.GET.get("days", 30))
+            if not 0 < dias <= self.MAXIMO_DIAS:
+                raise ValueError("Quantidade de dias fora do intervalo permitido")
+            inicio = fim - timedelta(days=dias)
+
+        if inicio > fim:
+            raise ValueError("Data inicial posterior à data final")
+        if (fim - inicio).days > self.MAXIMO_DIAS:
+            raise ValueError("Período longo demais")
+        return inicio, fim
+
+    def get(self, request, *args, **kwargs):
+        try:
+            inicio, fim = self._obter_periodo(request)
+        except (ValueError, OverflowError):
+            return JsonResponseHelper.erro("Período inválido")
+
+        # Lê o resumo diário materializado (DailyNutritionSummary) em vez de
+        # agrupar DailyLog a cada requisição; os totais são os mesmos.
+        resumos = DailyNutritionSummary.objects.filter(
+            user=request.user, date__range=(inicio, fim)
+        )
+        dados = self.preparar_dados_grafico(
+            resumos,
+            "date",
+            "total_calories",
+            limite_dias=None,
+            campos_extras={
+                "protein": "total_protein",
+                "carbs": "total_carbs",
+                "fat": "total_fat",
+            },
+            max_pontos=TimeSeriesUtils.ler_maximo_pontos(request.GET),
+        )
+        dados.update({"start": inicio.isoformat(), "end": fim.isoformat()})
+        return JsonResponse(dados)
+
+
+class TDEEView(VersionedETagMixin, LoginRequiredMixin, View):
+    datasets_versionados = ["weight", "daily_log"]
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(TDEEEstimate.for_user(request.user))
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from logbook.models import SessionExerciseSummary, WorkoutSession
+from users.models import DataVersion
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói ou verifica os resumos por exercício dos treinos concluídos "
+        "a partir das séries registradas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Apenas compara os resumos com as séries, sem alterar nada",
+        )
+        parser.add_argument(
+            "--user", help="Restringe a operação ao usuário com este username"
+        )
+
+    def handle(self, *args, **options):
+        sessions = WorkoutSession.objects.filter(status="completed")
+        summaries = SessionExerciseSummary.objects.all()
+
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário "{options["user"]}" não encontrado.')
+            sessions = sessions.filter(user=user)
+            summaries = summaries.filter(user=user)
+
+        esperados = SessionExerciseSummary.build_for_sessions(
+            sessions.only("pk", "user_id", "date")
+        )
+
+        if options["verify"]:
+            self._verificar(esperados, summaries)
+        else:
+            self._reconstruir(esperados, summaries)
+
+    def _verificar(self, esperados, summaries):
+        campos = ["date", *SessionExerciseSummary.SUMMARY_FIELDS]
+        esperados = {
+            (resumo.workout_session_id, resumo.exercise_id): {
+                campo: getattr(resumo, campo) for campo in campos
+            }
+            for resumo in esperados
+        }
+        atuais = {
+            (linha.pop("workout_session"), linha.pop("exercise")): linha
+            for linha in summaries.values("workout_session", "exercise", *campos)
+        }
+
+        divergencias = 0
+        for chave in sorted(set(esperados) | set(atuais)):
+            esperado = esperados.get(chave)
+            atual = atuais.get(chave)
+            if esperado != atual:
+                divergencias += 1
+                session_id, exercise_id = chave
+                self.stdout.write(
+                    f"Treino {session_id}, exercício {exercise_id}: "
+                    f"esperado {esperado}, encontrado {atual}"
+                )
+
+        if divergencias:
+            raise CommandError(f"{divergencias} resumo(s) divergente(s).")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(esperados)} resumo(s) verificados, sem divergências."
+            )
+        )
+
+    def _reconstruir(self, esperados, summaries):
+        usuarios = {resumo.user_id for resumo in esperados}
+        usuarios.update(summaries.values_list("user", flat=True).distinct())
+
+        with transaction.atomic():
+            summaries.delete()
+            SessionExerciseSummary.objects.bulk_create(esperados, batch_size=500)
+            for user_id in usuarios:
+                DataVersion.bump(user_id, "workouts")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(esperados)} resumo(s) de exercício reconstruídos."
+            )
+        )
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def initialize_workout_exercises(apps, schema_editor):
+    WorkoutSession = apps.get_model("logbook", "WorkoutSession")
+    WorkoutExercise = apps.get_model("logbook", "WorkoutExercise")
+    RoutineExercise = apps.get_model("logbook", "RoutineExercise")
+
+    sessions = WorkoutSession.objects.filter(workout_exercises__isnull=True)
+    novos = [
+        WorkoutExercise(
+            workout_session_id=session_id,
+            exercise_id=exercise_id,
+            order=order,
+            sets=sets,
+        )
+        for session_id, routine_id in sessions.values_list("pk", "routine_id")
+        for exercise_id, order, sets in RoutineExercise.objects.filter(
+            routine_id=routine_id
+        ).values_list("exercise_id", "order", "sets")
+    ]
+    WorkoutExercise.objects.bulk_create(novos, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logbook", "0006_initialize_workout_exercises"),
+    ]
+
+    operations = [
+        migrations.RunPython(initialize_workout_exercises, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,201 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:47
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+CENTESIMO = Decimal("0.01")
+
+
+def invalidar_versoes(apps, user_ids):
+    DataVersion = apps.get_model("users", "DataVersion")
+    DataVersion.objects.filter(user_id__in=user_ids, dataset="workouts").update(
+        version=F("version") + 1
+    )
+    existentes = set(
+        DataVersion.objects.filter(
+            user_id__in=user_ids, dataset="workouts"
+        ).values_list("user_id", flat=True)
+    )
+    DataVersion.objects.bulk_create(
+        [
+            DataVersion(user_id=user_id, dataset="workouts", version=1)
+            for user_id in set(user_ids) - existentes
+        ]
+    )
+
+
+def estimar_1rm(weight, reps):
+    if reps == 0:
+        return Decimal("0.00")
+    if reps == 1:
+        return weight
+    return (weight * (30 + reps) / 30).quantize(CENTESIMO)
+
+
+def resumir(sets):
+    totais = {
+        "set_count": 0,
+        "total_reps": 0,
+        "total_volume": Decimal("0.00"),
+        "weight_sum": Decimal("0.00"),
+        "top_weight": Decimal("0.00"),
+        "top_reps": 0,
+        "estimated_1rm": Decimal("0.00"),
+    }
+    for weight, reps in sets:
+        totais["set_count"] += 1
+        totais["total_reps"] += reps
+        totais["total_volume"] += weight * reps
+        totais["weight_sum"] += weight
+        if (weight, reps) > (totais["top_weight"], totais["top_reps"]):
+            totais["top_weight"], totais["top_reps"] = weight, reps
+        totais["estimated_1rm"] = max(
+            totais["estimated_1rm"], estimar_1rm(weight, reps)
+        )
+    return totais
+
+
+def preencher_resumos(apps, schema_editor):
+    WorkoutSession = apps.get_model("logbook", "WorkoutSession")
+    SetLog = apps.get_model("logbook", "SetLog")
+    SessionExerciseSummary = apps.get_model("logbook", "SessionExerciseSummary")
+
+    sessoes = {
+        pk: (user_id, data)
+        for pk, user_id, data in WorkoutSession.objects.filter(
+            status="completed"
+        ).values_list("pk", "user_id", "date")
+    }
+    series = {}
+    for session_id, exercise_id, weight, reps in (
+        SetLog.objects.filter(workout_session_id__in=sessoes)
+        .order_by()
+        .values_list("workout_session_id", "exercise_id", "weight", "reps")
+    ):
+        series.setdefault((session_id, exercise_id), []).append((weight, reps))
+
+    SessionExerciseSummary.objects.bulk_create(
+        [
+            SessionExerciseSummary(
+                workout_session_id=session_id,
+                exercise_id=exercise_id,
+                user_id=sessoes[session_id][0],
+                date=sessoes[session_id][1],
+                **resumir(sets),
+            )
+            for (session_id, exercise_id), sets in series.items()
+        ],
+        batch_size=500,
+    )
+    invalidar_versoes(apps, {user_id for user_id, _ in sessoes.values()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logbook", "0007_initialize_remaining_workout_exercises"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SessionExerciseSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(help_text="Data do treino")),
+                (
+                    "set_count",
+                    models.PositiveIntegerField(help_text="Séries registradas"),
+                ),
+                (
+                    "total_reps",
+                    models.PositiveIntegerField(help_text="Repetições somadas"),
+                ),
+                (
+                    "total_volume",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Soma de peso x repetições (kg)",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "weight_sum",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Soma dos pesos das séries (kg)",
+                        max_digits=10,
+                    ),
+                ),
+                (
+                    "top_weight",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Peso da série mais pesada (kg)",
+                        max_digits=6,
+                    ),
+                ),
+                (
+                    "top_reps",
+                    models.PositiveIntegerField(
+                        help_text="Repetições da série mais pesada"
+                    ),
+                ),
+                (
+                    "estimated_1rm",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Melhor 1RM estimado (Epley)",
+                        max_digits=7,
+                    ),
+                ),
+                (
+                    "exercise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="logbook.exercise",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exercise_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "workout_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exercise_summaries",
+                        to="logbook.workoutsession",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "exercise", "date"],
+                        name="logbook_ses_user_id_6cab6e_idx",
+                    )
+                ],
+                "unique_together": {("workout_session", "exercise")},
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,190 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:50
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+ZERO = Decimal("0.00")
+CENTESIMO = Decimal("0.01")
+
+
+def estimar_1rm(weight, reps):
+    if reps == 1:
+        return weight
+    return (weight * (30 + reps) / 30).quantize(CENTESIMO)
+
+
+def chave(record_type, weight):
+    return (record_type, weight if record_type == "reps" else ZERO)
+
+
+def calcular_recordes(linhas):
+    melhores = {}
+    volumes = {}
+
+    def considerar(chave_recorde, valor, dados):
+        if chave_recorde not in melhores or valor > melhores[chave_recorde][0]:
+            melhores[chave_recorde] = (valor, dados)
+
+    for set_id, session_id, data, weight, reps in linhas:
+        dados = (session_id, set_id, weight, reps, data)
+        considerar(chave("weight", weight), (weight, reps), dados)
+        considerar(chave("reps", weight), (Decimal(reps),), dados)
+        considerar(chave("e1rm", weight), (estimar_1rm(weight, reps),), dados)
+        volume = volumes.setdefault(session_id, [ZERO, data])
+        volume[0] += weight * reps
+
+    for session_id, (volume, data) in volumes.items():
+        considerar(chave("volume", None), (volume,), (session_id, None, ZERO, 0, data))
+
+    return [
+        {
+            "record_type": record_type,
+            "reference_weight": referencia,
+            "value": valor[0],
+            "workout_session_id": session_id,
+            "set_log_id": set_id,
+            "weight": weight,
+            "reps": reps,
+            "date": data,
+        }
+        for (record_type, referencia), (
+            valor,
+            (session_id, set_id, weight, reps, data),
+        ) in melhores.items()
+    ]
+
+
+def preencher_recordes(apps, schema_editor):
+    SetLog = apps.get_model("logbook", "SetLog")
+    PersonalRecord = apps.get_model("logbook", "PersonalRecord")
+
+    series = {}
+    for linha in (
+        SetLog.objects.filter(reps__gt=0)
+        .order_by("workout_session__date", "workout_session_id", "set_number")
+        .values_list(
+            "workout_session__user_id",
+            "exercise_id",
+            "pk",
+            "workout_session_id",
+            "workout_session__date",
+            "weight",
+            "reps",
+        )
+    ):
+        series.setdefault(linha[:2], []).append(linha[2:])
+
+    PersonalRecord.objects.bulk_create(
+        [
+            PersonalRecord(user_id=user_id, exercise_id=exercise_id, **campos)
+            for (user_id, exercise_id), linhas in series.items()
+            for campos in calcular_recordes(linhas)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logbook", "0008_sessionexercisesummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PersonalRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "record_type",
+                    models.CharField(
+                        choices=[
+                            ("weight", "Maior peso"),
+                            ("reps", "Mais repetições no peso"),
+                            ("e1rm", "Melhor 1RM estimado"),
+                            ("volume", "Maior volume na sessão"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                (
+                    "reference_weight",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Peso ao qual o recorde de repetições se refere",
+                        max_digits=6,
+                    ),
+                ),
+                (
+                    "value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Valor do recorde (kg ou reps)",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "weight",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=6),
+                ),
+                ("reps", models.PositiveIntegerField(default=0)),
+                (
+                    "date",
+                    models.DateField(help_text="Data em que o recorde foi atingido"),
+                ),
+                (
+                    "exercise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="logbook.exercise",
+                    ),
+                ),
+                (
+                    "set_log",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="personal_records",
+                        to="logbook.setlog",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="personal_records",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "workout_session",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="personal_records",
+                        to="logbook.workoutsession",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+                "unique_together": {
+                    ("user", "exercise", "record_type", "reference_weight")
+                },
+            },
+        ),
+        migrations.RunPython(preencher_recordes, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from datetime import timedelta
+from decimal import Decimal
+
+from users.models import DataVersion
 
 User = get_user_model()
 
+TEMPO_CACHE_DASHBOARD = 60 * 60
+
 
 class Exercise(models.Model):
     name = models.CharField(max_length=100, help_text="Nome do exercício")
@@ -38,6 +46,17 @@ class Exercise(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.user_id:
+            DataVersion.bump(self.user_id, "workouts")
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        if self.user_id:
+            DataVersion.bump(self.user_id, "workouts")
+        return resultado
+
 
 class Routine(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="routines")
@@ -63,6 +82,76 @@ class Routine(models.Model):
     def __str__(self):
         return f"{self.name} - {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        DataVersion.bump(self.user_id, "workouts")
+
+    def delete(self, *args, **kwargs):
+        exercicios = set(
+            PersonalRecord.objects.filter(workout_session__routine=self).values_list(
+                "exercise_id", flat=True
+            )
+        )
+        resultado = super().delete(*args, **kwargs)
+        DataVersion.bump(self.user_id, "workouts")
+        for exercise_id in exercicios:
+            PersonalRecord.recompute_exercise(self.user_id, exercise_id)
+        return resultado
+
+    SORT_OPTIONS = {
+        "name": ["name"],
+        "recent": [F("last_performed").desc(nulls_last=True), "name"],
+        "frequent": ["-times_performed", "name"],
+        "created": ["-created_at"],
+    }
+    SORT_CHOICES = [
+        ("name", "Nome"),
+        ("recent", "Treino mais recente"),
+        ("frequent", "Mais realizadas"),
+        ("created", "Criação mais recente"),
+    ]
+    FILTER_DAYS = 30
+    FILTER_CHOICES = [
+        ("", "Todas"),
+        ("recent", f"Treinadas nos últimos {FILTER_DAYS} dias"),
+        ("stale", f"Sem treino há {FILTER_DAYS} dias"),
+        ("never", "Nunca realizadas"),
+    ]
+
+    @classmethod
+    def with_stats(cls, user, sort="name", filtro=None):
+        sessoes = WorkoutSession.objects.filter(
+            routine=OuterRef("pk"), status="completed"
+        ).order_by()
+        queryset = cls.objects.filter(user=user).annotate(
+            exercise_count=Count("routine_exercises"),
+            planned_sets=Coalesce(Sum("routine_exercises__sets"), 0),
+            times_performed=Coalesce(
+                Subquery(
+                    sessoes.values("routine")
+                    .annotate(total=Count("pk"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            last_performed=Subquery(
+                sessoes.values("routine").annotate(ultima=Max("date")).values("ultima")
+            ),
+        )
+
+        limite = timezone.now().date() - timedelta(days=cls.FILTER_DAYS)
+        if filtro == "recent":
+            queryset = queryset.filter(last_performed__gte=limite)
+        elif filtro == "stale":
+            queryset = queryset.filter(
+                Q(last_performed__lt=limite) | Q(last_performed__isnull=True)
+            )
+        elif filtro == "never":
+            queryset = queryset.filter(times_performed=0)
+
+        return queryset.order_by(*cls.SORT_OPTIONS.get(sort, cls.SORT_OPTIONS["name"]))
+
     def can_start_workout(self):
         return self.routine_exercises.exists()
 
@@ -131,6 +220,84 @@ class WorkoutSession(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.routine.name} ({self.date})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        DataVersion.bump(self.user_id, "workouts")
+
+    def delete(self, *args, **kwargs):
+        exercicios = set(self.personal_records.values_list("exercise_id", flat=True))
+        resultado = super().delete(*args, **kwargs)
+        DataVersion.bump(self.user_id, "workouts")
+        for exercise_id in exercicios:
+            PersonalRecord.recompute_exercise(self.user_id, exercise_id)
+        return resultado
+
+    @staticmethod
+    def dashboard_cache_key(user_id, hoje):
+        (versao,) = DataVersion.get_versions(user_id, ["workouts"])
+        return f"logbook:dashboard:{user_id}:v{versao}:{hoje.isoformat()}"
+
+    @classmethod
+    def get_dashboard_data(cls, user):
+        hoje = timezone.now().date()
+        chave = cls.dashboard_cache_key(getattr(user, "pk", user), hoje)
+        dados = cache.get(chave)
+        if dados is None:
+            dados = cls._calculate_dashboard_data(user, hoje)
+            cache.set(chave, dados, TEMPO_CACHE_DASHBOARD)
+        return dados
+
+    @staticmethod
+    def _contagem(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.order_by()
+                .values("user")
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    @classmethod
+    def _calculate_dashboard_data(cls, user, hoje):
+        concluidas = Q(workout_sessions__status="completed")
+        stats = (
+            User.objects.filter(pk=getattr(user, "pk", user))
+            .annotate(
+                total_routines=cls._contagem(
+                    Routine.objects.filter(user=OuterRef("pk"))
+                ),
+                total_exercises=cls._contagem(
+                    Exercise.objects.filter(user=OuterRef("pk"))
+                ),
+                total_workouts=Count("workout_sessions", filter=concluidas),
+                workouts_this_week=Count(
+                    "workout_sessions",
+                    filter=concluidas
+                    & Q(workout_sessions__date__gte=hoje - timedelta(days=7)),
+                ),
+            )
+            .values(
+                "total_routines",
+                "total_exercises",
+                "total_workouts",
+                "workouts_this_week",
+            )
+            .get()
+        )
+
+        sessoes = cls.objects.filter(user=user).select_related("routine")
+        return {
+            "date": hoje,
+            "stats": stats,
+            "recent_sessions": list(
+                sessoes.filter(status="completed").order_by("-date", "-start_time")[:5]
+            ),
+            "active_session": sessoes.filter(status="active").first(),
+        }
+
     @property
     def duration(self):
         if self.end_time:
@@ -152,21 +319,30 @@ class WorkoutSession(models.Model):
         completed = self.set_logs.count()
         return min(100, (completed / total_planned) * 100)
 
-    def initialize_workout_exercises(self):
-        if self.workout_exercises.exists():
-            return
+    @classmethod
+    def start(cls, user, routine, workout_date):
+        with transaction.atomic():
+            session = cls.objects.create(user=user, routine=routine, date=workout_date)
+            session.initialize_workout_exercises()
+        return session
 
-        for routine_exercise in self.routine.routine_exercises.all():
-            WorkoutExercise.objects.create(
-                workout_session=self,
-                exercise=routine_exercise.exercise,
-                order=routine_exercise.order,
-                sets=routine_exercise.sets,
-            )
+    def initialize_workout_exercises(self):
+        plano = self.routine.routine_exercises.values_list(
+            "exercise_id", "order", "sets"
+        )
+        WorkoutExercise.objects.bulk_create(
+            [
+                WorkoutExercise(
+                    workout_session=self,
+                    exercise_id=exercise_id,
+                    order=order,
+                    sets=sets,
+                )
+                for exercise_id, order, sets in plano
+            ]
+        )
 
     def get_workout_exercises(self):
-        if not self.workout_exercises.exists():
-            self.initialize_workout_exercises()
         return self.workout_exercises.all()
 
     def get_total_planned_sets(self):
@@ -225,3 +401,344 @@ class SetLog(models.Model):
             f"{self.exercise.name} - Série {self.set_number}: "
             f"{self.weight}kg x {self.reps} reps"
         )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        DataVersion.bump(self.workout_session.user_id, "workouts")
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        DataVersion.bump(self.workout_session.user_id, "workouts")
+        return resultado
+
+
+class SessionExerciseSummary(models.Model):
+    SUMMARY_FIELDS = [
+        "set_count",
+        "total_reps",
+        "total_volume",
+        "weight_sum",
+        "top_weight",
+        "top_reps",
+        "estimated_1rm",
+    ]
+
+    workout_session = models.ForeignKey(
+        WorkoutSession, on_delete=models.CASCADE, related_name="exercise_summaries"
+    )
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="exercise_summaries"
+    )
+    date = models.DateField(help_text="Data do treino")
+    set_count = models.PositiveIntegerField(help_text="Séries registradas")
+    total_reps = models.PositiveIntegerField(help_text="Repetições somadas")
+    total_volume = models.DecimalField(
+        max_digits=12, decimal_places=2, help_text="Soma de peso x repetições (kg)"
+    )
+    weight_sum = models.DecimalField(
+        max_digits=10, decimal_places=2, help_text="Soma dos pesos das séries (kg)"
+    )
+    top_weight = models.DecimalField(
+        max_digits=6, decimal_places=2, help_text="Peso da série mais pesada (kg)"
+    )
+    top_reps = models.PositiveIntegerField(help_text="Repetições da série mais pesada")
+    estimated_1rm = models.DecimalField(
+        max_digits=7, decimal_places=2, help_text="Melhor 1RM estimado (Epley)"
+    )
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ["workout_session", "exercise"]
+        indexes = [models.Index(fields=["user", "exercise", "date"])]
+
+    def __str__(self):
+        return f"{self.workout_session} - {self.exercise.name}"
+
+    @staticmethod
+    def estimate_1rm(weight, reps):
+        if reps == 0:
+            return Decimal("0.00")
+        if reps == 1:
+            return weight
+        return (weight * (30 + reps) / 30).quantize(Decimal("0.01"))
+
+    @classmethod
+    def summarize(cls, sets):
+        totais = {
+            "set_count": 0,
+            "total_reps": 0,
+            "total_volume": Decimal("0.00"),
+            "weight_sum": Decimal("0.00"),
+            "top_weight": Decimal("0.00"),
+            "top_reps": 0,
+            "estimated_1rm": Decimal("0.00"),
+        }
+        for weight, reps in sets:
+            totais["set_count"] += 1
+            totais["total_reps"] += reps
+            totais["total_volume"] += weight * reps
+            totais["weight_sum"] += weight
+            if (weight, reps) > (totais["top_weight"], totais["top_reps"]):
+                totais["top_weight"], totais["top_reps"] = weight, reps
+            totais["estimated_1rm"] = max(
+                totais["estimated_1rm"], cls.estimate_1rm(weight, reps)
+            )
+        return totais
+
+    @classmethod
+    def build_for_sessions(cls, sessions, exercise_ids=None):
+        sessoes = {session.pk: session for session in sessions}
+        set_logs = SetLog.objects.filter(workout_session_id__in=sessoes)
+        if exercise_ids is not None:
+            set_logs = set_logs.filter(exercise_id__in=exercise_ids)
+
+        series = {}
+        for session_id, exercise_id, weight, reps in set_logs.order_by().values_list(
+            "workout_session_id", "exercise_id", "weight", "reps"
+        ):
+            series.setdefault((session_id, exercise_id), []).append((weight, reps))
+
+        return [
+            cls(
+                workout_session_id=session_id,
+                exercise_id=exercise_id,
+                user_id=sessoes[session_id].user_id,
+                date=sessoes[session_id].date,
+                **cls.summarize(sets),
+            )
+            for (session_id, exercise_id), sets in series.items()
+        ]
+
+    @classmethod
+    def refresh(cls, session, exercise_ids=None):
+        existentes = cls.objects.filter(workout_session=session)
+        if exercise_ids is not None:
+            existentes = existentes.filter(exercise_id__in=exercise_ids)
+
+        with transaction.atomic():
+            existentes.delete()
+            if session.status == "completed":
+                cls.objects.bulk_create(cls.build_for_sessions([session], exercise_ids))
+
+
+class PersonalRecord(models.Model):
+    RECORD_TYPES = [
+        ("weight", "Maior peso"),
+        ("reps", "Mais repetições no peso"),
+        ("e1rm", "Melhor 1RM estimado"),
+        ("volume", "Maior volume na sessão"),
+    ]
+    SET_RECORD_TYPES = ["weight", "reps", "e1rm"]
+    ZERO = Decimal("0.00")
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="personal_records"
+    )
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE)
+    record_type = models.CharField(max_length=6, choices=RECORD_TYPES)
+    reference_weight = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        default=0,
+        help_text="Peso ao qual o recorde de repetições se refere",
+    )
+    value = models.DecimalField(
+        max_digits=12, decimal_places=2, help_text="Valor do recorde (kg ou reps)"
+    )
+    workout_session = models.ForeignKey(
+        WorkoutSession, on_delete=models.CASCADE, related_name="personal_records"
+    )
+    set_log = models.ForeignKey(
+        "SetLog",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="personal_records",
+    )
+    weight = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    reps = models.PositiveIntegerField(default=0)
+    date = models.DateField(help_text="Data em que o recorde foi atingido")
+
+    class Meta:
+        ordering = ["-date"]
+        unique_together = ["user", "exercise", "record_type", "reference_weight"]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.exercise.name} ({self.record_type})"
+
+    @staticmethod
+    def _chave(record_type, weight):
+        return (record_type, weight if record_type == "reps" else PersonalRecord.ZERO)
+
+    @classmethod
+    def _candidatos_serie(cls, set_log):
+        return {
+            cls._chave("weight", set_log.weight): (set_log.weight, set_log.reps),
+            cls._chave("reps", set_log.weight): (Decimal(set_log.reps),),
+            cls._chave("e1rm", set_log.weight): (
+                SessionExerciseSummary.estimate_1rm(set_log.weight, set_log.reps),
+            ),
+        }
+
+    @staticmethod
+    def _volume_sessao(session_id, exercise_id):
+        return SetLog.objects.filter(
+            workout_session_id=session_id, exercise_id=exercise_id
+        ).aggregate(
+            total=Coalesce(
+                Sum(F("weight") * F("reps")),
+                Decimal("0.00"),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+        )[
+            "total"
+        ]
+
+    @classmethod
+    def _valor_atual(cls, record):
+        if record.record_type == "weight":
+            return (record.value, record.reps)
+        return (record.value,)
+
+    @classmethod
+    def register_set(cls, set_log, created=False):
+        session = set_log.workout_session
+        registros = {
+            cls._chave(record.record_type, record.reference_weight): record
+            for record in cls.objects.filter(
+                Q(record_type__in=["weight", "e1rm", "volume"])
+                | Q(record_type="reps", reference_weight=set_log.weight)
+                | Q(set_log=set_log),
+                user_id=session.user_id,
+                exercise_id=set_log.exercise_id,
+            )
+        }
+
+        if not created and any(
+            record.set_log_id == set_log.pk
+            or (
+                record.record_type == "volume"
+                and record.workout_session_id == session.pk
+            )
+            for record in registros.values()
+        ):
+            cls.recompute_exercise(session.user_id, set_log.exercise_id)
+            return
+
+        volume = cls._volume_sessao(session.pk, set_log.exercise_id)
+        candidatos = cls._candidatos_serie(set_log)
+        candidatos[cls._chave("volume", None)] = (volume,)
+
+        for (record_type, referencia), candidato in candidatos.items():
+            atual = registros.get((record_type, referencia))
+            if atual is not None and candidato <= cls._valor_atual(atual):
+                continue
+            volume_sessao = record_type == "volume"
+            if not volume_sessao and set_log.reps == 0:
+                continue
+            cls.objects.update_or_create(
+                user_id=session.user_id,
+                exercise_id=set_log.exercise_id,
+                record_type=record_type,
+                reference_weight=referencia,
+                defaults={
+                    "value": candidato[0],
+                    "workout_session": session,
+                    "set_log": None if volume_sessao else set_log,
+                    "weight": cls.ZERO if volume_sessao else set_log.weight,
+                    "reps": 0 if volume_sessao else set_log.reps,
+                    "date": session.date,
+                },
+            )
+
+    @classmethod
+    def compute(cls, series):
+        melhores = {}
+        volumes = {}
+
+        def considerar(chave, valor, dados):
+            if chave not in melhores or valor > melhores[chave][0]:
+                melhores[chave] = (valor, dados)
+
+        for set_id, session_id, data, weight, reps in series:
+            dados = (session_id, set_id, weight, reps, data)
+            considerar(cls._chave("weight", weight), (weight, reps), dados)
+            considerar(cls._chave("reps", weight), (Decimal(reps),), dados)
+            considerar(
+                cls._chave("e1rm", weight),
+                (SessionExerciseSummary.estimate_1rm(weight, reps),),
+                dados,
+            )
+            volume = volumes.setdefault(session_id, [cls.ZERO, data])
+            volume[0] += weight * reps
+
+        for session_id, (volume, data) in volumes.items():
+            considerar(
+                cls._chave("volume", None),
+                (volume,),
+                (session_id, None, cls.ZERO, 0, data),
+            )
+
+        return [
+            {
+                "record_type": record_type,
+                "reference_weight": referencia,
+                "value": valor[0],
+                "workout_session_id": session_id,
+                "set_log_id": set_id,
+                "weight": weight,
+                "reps": reps,
+                "date": data,
+            }
+            for (record_type, referencia), (
+                valor,
+                (session_id, set_id, weight, reps, data),
+            ) in melhores.items()
+        ]
+
+    @staticmethod
+    def series_queryset(set_logs):
+        return (
+            set_logs.filter(reps__gt=0)
+            .order_by("workout_session__date", "workout_session_id", "set_number")
+            .values_list(
+                "pk", "workout_session_id", "workout_session__date", "weight", "reps"
+            )
+        )
+
+    @classmethod
+    def recompute_exercise(cls, user, exercise_id):
+        user_id = getattr(user, "pk", user)
+        series = cls.series_queryset(
+            SetLog.objects.filter(
+                workout_session__user_id=user_id, exercise_id=exercise_id
+            )
+        )
+
+        with transaction.atomic():
+            cls.objects.filter(user_id=user_id, exercise_id=exercise_id).delete()
+            cls.objects.bulk_create(
+                [
+                    cls(user_id=user_id, exercise_id=exercise_id, **campos)
+                    for campos in cls.compute(series)
+                ]
+            )
+
+    @classmethod
+    def recompute_for_session(cls, session, exercise_ids=None):
+        registros = cls.objects.filter(workout_session=session)
+        if exercise_ids is not None:
+            registros = registros.filter(exercise_id__in=exercise_ids)
+        for exercise_id in set(registros.values_list("exercise_id", flat=True)):
+            cls.recompute_exercise(session.user_id, exercise_id)
+
+    @classmethod
+    def badges_for_session(cls, session):
+        rotulos = dict(cls.RECORD_TYPES)
+        badges = {}
+        for set_log_id, record_type in cls.objects.filter(
+            workout_session=session, set_log__isnull=False
+        ).values_list("set_log_id", "record_type"):
+            badges.setdefault(set_log_id, []).append(rotulos[record_type])
+        return badges
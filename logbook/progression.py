@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from shared.timeseries import MAXIMO_PONTOS_PADRAO, TimeSeriesUtils
+from .models import SessionExerciseSummary, SetLog
+
+FORMULAS_1RM = ("epley", "brzycki")
+FORMULA_PADRAO = "epley"
+REPS_MAXIMAS_BRZYCKI = 10
+CASAS_DECIMAIS = 2
+
+
+class ExerciseProgression:
+
+    @staticmethod
+    def ler_formula(parametros):
+        formula = parametros.get("formula", FORMULA_PADRAO)
+        return formula if formula in FORMULAS_1RM else FORMULA_PADRAO
+
+    @staticmethod
+    def carregar(user, exercise, inicio=None):
+        set_logs = SetLog.objects.filter(
+            exercise=exercise,
+            workout_session__user=user,
+            workout_session__status="completed",
+        )
+        if inicio is not None:
+            set_logs = set_logs.filter(workout_session__date__gte=inicio)
+        return set_logs.order_by(
+            "workout_session__date", "workout_session_id"
+        ).values_list("workout_session_id", "workout_session__date", "weight", "reps")
+
+    @staticmethod
+    def estimar_1rm(peso, reps, brzycki=False):
+        # Brzycki diverge com muitas repetições (o denominador tende a zero),
+        # então acima do limite a estimativa volta para Epley.
+        if brzycki and 1 < reps <= REPS_MAXIMAS_BRZYCKI:
+            return (peso * 36 / (37 - reps)).quantize(Decimal("0.01"))
+        return SessionExerciseSummary.estimate_1rm(peso, reps)
+
+    @classmethod
+    def calcular(cls, linhas, formula=FORMULA_PADRAO):
+        brzycki = formula == "brzycki"
+        datas, e1rm, tonelagem = [], [], []
+        series, repeticoes, melhor_peso, melhor_reps = [], [], [], []
+        sessao_atual = None
+
+        for session_id, data, peso, reps in linhas:
+            estimativa = float(cls.estimar_1rm(Decimal(peso), reps, brzycki))
+            peso = float(peso)
+
+            if session_id != sessao_atual:
+                sessao_atual = session_id
+                datas.append(data)
+                e1rm.append(estimativa)
+                tonelagem.append(peso * reps)
+                series.append(1)
+                repeticoes.append(reps)
+                melhor_peso.append(peso)
+                melhor_reps.append(reps)
+                continue
+
+            tonelagem[-1] += peso * reps
+            series[-1] += 1
+            repeticoes[-1] += reps
+            if estimativa > e1rm[-1] or (
+                estimativa == e1rm[-1] and peso > melhor_peso[-1]
+            ):
+                e1rm[-1] = estimativa
+                melhor_peso[-1] = peso
+                melhor_reps[-1] = reps
+
+        return {
+            "dates": datas,
+            "e1rm": e1rm,
+            "tonnage": tonelagem,
+            "sets": series,
+            "reps": repeticoes,
+            "best_weight": melhor_peso,
+            "best_reps": melhor_reps,
+        }
+
+    @classmethod
+    def get_series(
+        cls,
+        user,
+        exercise,
+        inicio=None,
+        formula=FORMULA_PADRAO,
+        max_points=MAXIMO_PONTOS_PADRAO,
+    ):
+        colunas = cls.calcular(cls.carregar(user, exercise, inicio), formula)
+
+        indices = TimeSeriesUtils.reduzir_por_data(
+            colunas["dates"], colunas["e1rm"], max_points
+        )
+        if len(indices) < len(colunas["dates"]):
+            colunas = dict(
+                zip(colunas, TimeSeriesUtils.selecionar(indices, *colunas.values()))
+            )
+
+        return {
+            "formula": formula,
+            "points": len(colunas["dates"]),
+            "dates": [data.isoformat() for data in colunas["dates"]],
+            "e1rm": [round(valor, CASAS_DECIMAIS) for valor in colunas["e1rm"]],
+            "tonnage": [round(valor, CASAS_DECIMAIS) for valor in colunas["tonnage"]],
+            "sets": colunas["sets"],
+            "reps": colunas["reps"],
+            "best_weight": colunas["best_weight"],
+            "best_reps": colunas["best_reps"],
+        }
@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Exercise, Routine, RoutineExercise, SetLog, WorkoutSession
+
+User = get_user_model()
+
+CONSULTAS_PAGINA_SESSAO = 7
+
+
+class WorkoutSessionQueryCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("atleta", password="senha")
+        self.client.force_login(self.user)
+
+    def criar_sessao(self, total_exercicios, total_series, status="active"):
+        routine = Routine.objects.create(
+            user=self.user, name=f"Rotina {total_exercicios}x{total_series}"
+        )
+        for ordem in range(total_exercicios):
+            exercise = Exercise.objects.create(
+                user=self.user, name=f"Exercício {routine.pk}-{ordem}"
+            )
+            RoutineExercise.objects.create(
+                routine=routine, exercise=exercise, order=ordem, sets=total_series
+            )
+
+        session = WorkoutSession.start(self.user, routine, date.today())
+        SetLog.objects.bulk_create(
+            [
+                SetLog(
+                    workout_session=session,
+                    exercise=routine_exercise.exercise,
+                    set_number=numero,
+                    weight=50,
+                    reps=10,
+                )
+                for routine_exercise in routine.routine_exercises.all()
+                for numero in range(1, total_series + 1)
+            ]
+        )
+        if status != "active":
+            WorkoutSession.objects.filter(pk=session.pk).update(status=status)
+        return session
+
+    def assert_consultas_constantes(self, nome_url, status):
+        for total_exercicios, total_series in [(1, 1), (3, 4), (8, 6)]:
+            session = self.criar_sessao(total_exercicios, total_series, status)
+            with self.subTest(exercicios=total_exercicios, series=total_series):
+                with self.assertNumQueries(CONSULTAS_PAGINA_SESSAO):
+                    response = self.client.get(reverse(nome_url, args=[session.pk]))
+                self.assertEqual(response.status_code, 200)
+            WorkoutSession.objects.filter(pk=session.pk).update(status="completed")
+
+    def test_session_page_query_count_is_constant(self):
+        self.assert_consultas_constantes("logbook:workout_session", "active")
+
+    def test_session_edit_page_query_count_is_constant(self):
+        self.assert_consultas_constantes("logbook:workout_session_edit", "completed")
@@ -117,4 +117,10 @@ urlpatterns = [
         name="exercise_edit_ajax",
     ),
     path("progresso/", views.ExerciseProgressView.as_view(), name="exercise_progress"),
+    path(
+        "progresso/serie/",
+        views.ExerciseProgressionView.as_view(),
+        name="exercise_progression",
+    ),
+    path("recordes/", views.PersonalRecordsView.as_view(), name="personal_records"),
 ]
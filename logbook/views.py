@@ -1,10 +1,10 @@
-import json
 from datetime import date, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models, IntegrityError, transaction
 from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
@@ -14,6 +14,8 @@ from django.views.generic import (
     DetailView,
     TemplateView,
 )
+from shared.timeseries import TimeSeriesUtils
+from users.models import DataVersion
 from shared.utils import (
     BaseUserCreateView,
     BaseUserUpdateView,
@@ -22,6 +24,7 @@ from shared.utils import (
     ReorderMixin,
     ContextDataMixin,
     JsonResponseHelper,
+    VersionedETagMixin,
 )
 
 from .models import (
@@ -31,6 +34,8 @@ from .models import (
     WorkoutSession,
     SetLog,
     WorkoutExercise,
+    SessionExerciseSummary,
+    PersonalRecord,
 )
 from .forms import (
     RoutineForm,
@@ -40,22 +45,34 @@ from .forms import (
     SetLogForm,
     StartWorkoutForm,
 )
+from .progression import ExerciseProgression
 
 
 class WorkoutUtils:
     @staticmethod
     def gerar_dados_exercicios(session):
+        workout_exercises = list(
+            session.get_workout_exercises().select_related("exercise")
+        )
+
+        recordes = PersonalRecord.badges_for_session(session)
+
+        logs_por_exercicio = {}
+        for set_log in SetLog.objects.filter(workout_session=session).order_by(
+            "set_number"
+        ):
+            logs_por_exercicio.setdefault(set_log.exercise_id, {})[
+                set_log.set_number
+            ] = set_log
+
         exercises_data = []
-        for workout_exercise in session.get_workout_exercises():
+        for workout_exercise in workout_exercises:
             exercise = workout_exercise.exercise
-
-            existing_logs = SetLog.objects.filter(
-                workout_session=session, exercise=exercise
-            ).order_by("set_number")
+            logs_do_exercicio = logs_por_exercicio.get(exercise.id, {})
 
             forms = []
             for set_num in range(1, workout_exercise.sets + 1):
-                existing_log = existing_logs.filter(set_number=set_num).first()
+                existing_log = logs_do_exercicio.get(set_num)
 
                 if existing_log:
                     form = SetLogForm(instance=existing_log)
@@ -63,7 +80,14 @@ class WorkoutUtils:
                     form = SetLogForm(initial={"set_number": set_num})
 
                 forms.append(
-                    {"form": form, "set_number": set_num, "existing_log": existing_log}
+                    {
+                        "form": form,
+                        "set_number": set_num,
+                        "existing_log": existing_log,
+                        "records": (
+                            recordes.get(existing_log.pk, []) if existing_log else []
+                        ),
+                    }
                 )
 
             exercises_data.append(
@@ -71,11 +95,27 @@ class WorkoutUtils:
                     "exercise": exercise,
                     "workout_exercise": workout_exercise,
                     "forms": forms,
-                    "existing_logs": existing_logs,
+                    "existing_logs": list(logs_do_exercicio.values()),
                 }
             )
         return exercises_data
 
+    @staticmethod
+    def carregar_dados_sessao(session, usuario):
+        exercises_data = WorkoutUtils.gerar_dados_exercicios(session)
+
+        current_exercise_ids = [dados["exercise"].id for dados in exercises_data]
+        available_exercises = list(
+            Exercise.objects.filter(Q(user=usuario) | Q(user__isnull=True))
+            .exclude(id__in=current_exercise_ids)
+            .order_by("name")
+        )
+
+        return {
+            "exercises_data": exercises_data,
+            "available_exercises": available_exercises,
+        }
+
 
 class BaseWorkoutValidationMixin:
     def validate_active_session(self, session):
@@ -103,7 +143,19 @@ class RoutineListView(LoginRequiredMixin, ListView):
     context_object_name = "routines"
 
     def get_queryset(self):
-        return Routine.objects.filter(user=self.request.user)
+        return Routine.with_stats(
+            self.request.user,
+            sort=self.request.GET.get("sort", "name"),
+            filtro=self.request.GET.get("filter"),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["sort"] = self.request.GET.get("sort", "name")
+        context["filter"] = self.request.GET.get("filter", "")
+        context["sort_choices"] = Routine.SORT_CHOICES
+        context["filter_choices"] = Routine.FILTER_CHOICES
+        return context
 
 
 class RoutineCreateView(BaseUserCreateView):
@@ -387,10 +439,9 @@ class StartWorkoutView(LoginRequiredMixin, View):
             workout_date = form.cleaned_data["date"]
 
             try:
-                workout_session = WorkoutSession.objects.create(
-                    user=request.user, routine=routine, date=workout_date
+                workout_session = WorkoutSession.start(
+                    request.user, routine, workout_date
                 )
-                workout_session.initialize_workout_exercises()
 
                 messages.success(
                     request,
@@ -413,7 +464,9 @@ class WorkoutSessionView(LoginRequiredMixin, DetailView):
     context_object_name = "session"
 
     def get_queryset(self):
-        return WorkoutSession.objects.filter(user=self.request.user)
+        return WorkoutSession.objects.filter(user=self.request.user).select_related(
+            "routine"
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -422,20 +475,8 @@ class WorkoutSessionView(LoginRequiredMixin, DetailView):
         if session.status != "active":
             messages.warning(self.request, "Esta sessão de treino não está mais ativa.")
 
-        exercises_data = WorkoutUtils.gerar_dados_exercicios(session)
-
-        current_exercise_ids = [
-            we.exercise.id for we in session.get_workout_exercises()
-        ]
-        available_exercises = (
-            Exercise.objects.filter(Q(user=self.request.user) | Q(user__isnull=True))
-            .exclude(id__in=current_exercise_ids)
-            .order_by("name")
-        )
-
-        context["exercises_data"] = exercises_data
+        context.update(WorkoutUtils.carregar_dados_sessao(session, self.request.user))
         context["session_form"] = WorkoutSessionForm(instance=session)
-        context["available_exercises"] = available_exercises
         return context
 
 
@@ -472,11 +513,17 @@ class LogSetView(LoginRequiredMixin, View):
             form = SetLogForm(request.POST, instance=set_log)
             if form.is_valid():
                 form.save()
+                if session.status == "completed":
+                    SessionExerciseSummary.refresh(session, [exercise.id])
+                PersonalRecord.register_set(set_log, created)
 
                 return JsonResponseHelper.sucesso(
                     {
                         "weight": str(set_log.weight),
                         "reps": set_log.reps,
+                        "records": PersonalRecord.badges_for_session(session).get(
+                            set_log.pk, []
+                        ),
                     }
                 )
             else:
@@ -505,6 +552,7 @@ class CompleteWorkoutView(LoginRequiredMixin, View):
                 session.status = "completed"
                 session.end_time = timezone.now()
                 session.save()
+                SessionExerciseSummary.refresh(session)
 
                 messages.success(
                     request, f'Treino "{session.routine.name}" concluído com sucesso!'
@@ -544,30 +592,10 @@ class DashboardView(ContextDataMixin, LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        routines_qs = Routine.objects.filter(user=self.request.user)
-        exercises_qs = Exercise.objects.filter(user=self.request.user)
-        completed_workouts_qs = WorkoutSession.objects.filter(
-            user=self.request.user, status="completed"
-        )
-
-        context["stats"] = {
-            "total_routines": routines_qs.count(),
-            "total_exercises": exercises_qs.count(),
-            "total_workouts": completed_workouts_qs.count(),
-            "workouts_this_week": WorkoutSession.objects.filter(
-                user=self.request.user,
-                status="completed",
-                date__gte=timezone.now().date() - timedelta(days=7),
-            ).count(),
-        }
-
-        context["recent_sessions"] = completed_workouts_qs.order_by(
-            "-date", "-start_time"
-        )[:5]
-
-        context["active_session"] = WorkoutSession.objects.filter(
-            user=self.request.user, status="active"
-        ).first()
+        dados = WorkoutSession.get_dashboard_data(self.request.user)
+        context["stats"] = dados["stats"]
+        context["recent_sessions"] = dados["recent_sessions"]
+        context["active_session"] = dados["active_session"]
 
         return context
 
@@ -588,7 +616,6 @@ class ExerciseProgressView(LoginRequiredMixin, TemplateView):
 
         selected_exercise = None
         stats = None
-        chart_data = None
         recent_sets = None
 
         if exercise_id:
@@ -605,59 +632,40 @@ class ExerciseProgressView(LoginRequiredMixin, TemplateView):
                 days_ago = int(period)
                 start_date = date.today() - timedelta(days=days_ago)
 
-                set_logs = SetLog.objects.filter(
-                    exercise=selected_exercise,
-                    workout_session__user=user,
-                    workout_session__status="completed",
-                    workout_session__date__gte=start_date,
-                ).order_by("workout_session__date", "set_number")
-
-                if set_logs.exists():
-                    total_workouts = (
-                        set_logs.values("workout_session").distinct().count()
-                    )
-                    total_sets = set_logs.count()
-                    max_weight = (
-                        set_logs.aggregate(models.Max("weight"))["weight__max"] or 0
-                    )
-
-                    sets_per_workout = {}
-                    for log in set_logs:
-                        workout_id = log.workout_session.id
-                        if workout_id not in sets_per_workout:
-                            sets_per_workout[workout_id] = set()
-                        sets_per_workout[workout_id].add(log.set_number)
-
-                    avg_sets_per_workout = (
-                        sum(len(sets) for sets in sets_per_workout.values())
-                        / len(sets_per_workout)
-                        if sets_per_workout
-                        else 0
-                    )
-                    max_sets_in_workout = (
-                        max(len(sets) for sets in sets_per_workout.values())
-                        if sets_per_workout
-                        else 0
-                    )
-
-                    avg_weight = (
-                        set_logs.aggregate(models.Avg("weight"))["weight__avg"] or 0
-                    )
+                totais = SessionExerciseSummary.objects.filter(
+                    user=user, exercise=selected_exercise, date__gte=start_date
+                ).aggregate(
+                    total_workouts=models.Count("pk"),
+                    total_sets=models.Sum("set_count"),
+                    max_weight=models.Max("top_weight"),
+                    weight_sum=models.Sum("weight_sum"),
+                    max_sets_in_workout=models.Max("set_count"),
+                )
 
+                if totais["total_workouts"]:
                     stats = {
-                        "total_workouts": total_workouts,
-                        "total_sets": total_sets,
-                        "max_weight": max_weight,
-                        "avg_weight": round(avg_weight, 1),
-                        "avg_sets_per_workout": round(avg_sets_per_workout, 1),
-                        "max_sets_in_workout": max_sets_in_workout,
+                        "total_workouts": totais["total_workouts"],
+                        "total_sets": totais["total_sets"],
+                        "max_weight": totais["max_weight"],
+                        "avg_weight": round(
+                            totais["weight_sum"] / totais["total_sets"], 1
+                        ),
+                        "avg_sets_per_workout": round(
+                            totais["total_sets"] / totais["total_workouts"], 1
+                        ),
+                        "max_sets_in_workout": totais["max_sets_in_workout"],
                     }
 
-                    chart_data = self._prepare_chart_data(set_logs)
-
-                    recent_sets = set_logs.order_by(
-                        "-workout_session__date", "-set_number"
-                    )[:10]
+                    recent_sets = (
+                        SetLog.objects.filter(
+                            exercise=selected_exercise,
+                            workout_session__user=user,
+                            workout_session__status="completed",
+                            workout_session__date__gte=start_date,
+                        )
+                        .select_related("workout_session")
+                        .order_by("-workout_session__date", "-set_number")[:10]
+                    )
 
                 else:
                     stats = {
@@ -678,118 +686,83 @@ class ExerciseProgressView(LoginRequiredMixin, TemplateView):
                 "selected_exercise": selected_exercise,
                 "period": period,
                 "stats": stats,
-                "chart_data": chart_data,
                 "recent_sets": recent_sets,
             }
         )
 
         return context
 
-    def _prepare_chart_data(self, set_logs):
-        workout_data = {}
-
-        for log in set_logs:
-            workout_date = log.workout_session.date
-            set_number = log.set_number
-
-            if workout_date not in workout_data:
-                workout_data[workout_date] = {}
 
-            if set_number not in workout_data[workout_date]:
-                workout_data[workout_date][set_number] = []
+class ExerciseProgressionView(VersionedETagMixin, LoginRequiredMixin, View):
+    datasets_versionados = ["workouts"]
 
-            workout_data[workout_date][set_number].append(
-                {
-                    "weight": float(log.weight),
-                    "reps": log.reps,
-                    "datetime": log.workout_session.date,
-                }
+    def get(self, request):
+        exercise_id = request.GET.get("exercise", "")
+        exercise = (
+            Exercise.objects.filter(id=exercise_id)
+            .filter(Q(user=request.user) | Q(user__isnull=True))
+            .first()
+            if exercise_id.isdigit()
+            else None
+        )
+        if not exercise:
+            return JsonResponseHelper.erro("Exercício inválido")
+
+        inicio = None
+        period = request.GET.get("period")
+        if period:
+            if not period.isdigit():
+                return JsonResponseHelper.erro("Período inválido")
+            inicio = date.today() - timedelta(days=int(period))
+
+        return JsonResponse(
+            ExerciseProgression.get_series(
+                request.user,
+                exercise,
+                inicio=inicio,
+                formula=ExerciseProgression.ler_formula(request.GET),
+                max_points=TimeSeriesUtils.ler_maximo_pontos(request.GET),
             )
+        )
 
-        all_set_numbers = set()
-        for date_data in workout_data.values():
-            all_set_numbers.update(date_data.keys())
-
-        all_set_numbers = sorted(all_set_numbers)
-
-        datasets = []
-        colors = [
-            "#dc3545",
-            "#28a745",
-            "#007bff",
-            "#ffc107",
-            "#6f42c1",
-            "#fd7e14",
-            "#20c997",
-            "#e83e8c",
-        ]
-
-        sorted_dates = sorted(workout_data.keys())
-
-        for i, set_num in enumerate(all_set_numbers):
-            color = colors[i % len(colors)]
-
-            set_data = []
-
-            for workout_date in sorted_dates:
-                if set_num in workout_data[workout_date]:
-                    max_weight = max(
-                        entry["weight"] for entry in workout_data[workout_date][set_num]
-                    )
-                    set_data.append(
-                        {"x": workout_date.strftime("%Y-%m-%d"), "y": max_weight}
-                    )
-                else:
-                    set_data.append({"x": workout_date.strftime("%Y-%m-%d"), "y": None})
-
-            datasets.append(
-                {
-                    "label": f"Set {set_num}",
-                    "data": set_data,
-                    "borderColor": color,
-                    "backgroundColor": color + "20",
-                    "tension": 0.3,
-                    "fill": False,
-                    "pointRadius": 4,
-                    "pointHoverRadius": 6,
-                    "connectNulls": False,
-                }
-            )
 
-        max_weight_data = []
-        for workout_date in sorted_dates:
-            max_weight = 0
-            for set_data in workout_data[workout_date].values():
-                for entry in set_data:
-                    max_weight = max(max_weight, entry["weight"])
+class PersonalRecordsView(VersionedETagMixin, LoginRequiredMixin, View):
+    datasets_versionados = ["workouts"]
 
-            max_weight_data.append(
-                {"x": workout_date.strftime("%Y-%m-%d"), "y": max_weight}
-            )
+    def get(self, request):
+        records = PersonalRecord.objects.filter(user=request.user).select_related(
+            "exercise"
+        )
+        exercise_id = request.GET.get("exercise")
+        if exercise_id:
+            if not exercise_id.isdigit():
+                return JsonResponseHelper.erro("Exercício inválido")
+            records = records.filter(exercise_id=exercise_id)
 
-        datasets.append(
+        return JsonResponseHelper.sucesso(
             {
-                "label": "Peso Máximo do Treino",
-                "data": max_weight_data,
-                "borderColor": "#000000",
-                "backgroundColor": "rgba(0, 0, 0, 0.1)",
-                "tension": 0.3,
-                "fill": False,
-                "pointRadius": 6,
-                "pointHoverRadius": 8,
-                "borderWidth": 3,
-                "borderDash": [5, 5],
+                "records": [
+                    {
+                        "exercise_id": record.exercise_id,
+                        "exercise": record.exercise.name,
+                        "type": record.record_type,
+                        "label": record.get_record_type_display(),
+                        "reference_weight": (
+                            str(record.reference_weight)
+                            if record.record_type == "reps"
+                            else None
+                        ),
+                        "value": str(record.value),
+                        "weight": str(record.weight),
+                        "reps": record.reps,
+                        "date": record.date.isoformat(),
+                        "session_id": record.workout_session_id,
+                    }
+                    for record in records.order_by("-date", "exercise__name")
+                ]
             }
         )
 
-        chart_data = {
-            "datasets": datasets,
-            "dates": [date.strftime("%Y-%m-%d") for date in sorted_dates],
-            "labels": [date.strftime("%d/%m") for date in sorted_dates],
-        }
-
-        return json.dumps(chart_data)
-
 
 class ReorderWorkoutExercisesView(ReorderMixin, LoginRequiredMixin, View):
     def post(self, request, session_id):
@@ -894,6 +867,9 @@ class RemoveExerciseFromWorkoutView(LoginRequiredMixin, View):
                 SetLog.objects.filter(
                     workout_session=session, exercise_id=exercise_id
                 ).delete()
+                DataVersion.bump(request.user, "workouts")
+                SessionExerciseSummary.refresh(session, [exercise_id])
+                PersonalRecord.recompute_for_session(session, [exercise_id])
 
                 WorkoutExercise.objects.filter(
                     workout_session=session, order__gt=removed_order
@@ -937,6 +913,9 @@ class UpdateWorkoutExerciseSetsView(
                         exercise_id=exercise_id,
                         set_number__gt=sets,
                     ).delete()
+                    DataVersion.bump(request.user, "workouts")
+                    SessionExerciseSummary.refresh(session, [exercise_id])
+                    PersonalRecord.recompute_for_session(session, [exercise_id])
 
             return JsonResponseHelper.sucesso()
         except WorkoutExercise.DoesNotExist:
@@ -1011,26 +990,16 @@ class WorkoutSessionEditView(LoginRequiredMixin, DetailView):
     context_object_name = "session"
 
     def get_queryset(self):
-        return WorkoutSession.objects.filter(user=self.request.user, status="completed")
+        return WorkoutSession.objects.filter(
+            user=self.request.user, status="completed"
+        ).select_related("routine")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         session = self.object
 
-        exercises_data = WorkoutUtils.gerar_dados_exercicios(session)
-
-        current_exercise_ids = [
-            we.exercise.id for we in session.get_workout_exercises()
-        ]
-        available_exercises = (
-            Exercise.objects.filter(Q(user=self.request.user) | Q(user__isnull=True))
-            .exclude(id__in=current_exercise_ids)
-            .order_by("name")
-        )
-
-        context["exercises_data"] = exercises_data
+        context.update(WorkoutUtils.carregar_dados_sessao(session, self.request.user))
         context["session_form"] = WorkoutSessionForm(instance=session)
-        context["available_exercises"] = available_exercises
         return context
 
     def post(self, request, *args, **kwargs):
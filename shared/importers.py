@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+TAMANHO_LOTE_PADRAO = 500
+MAXIMO_ERROS_DETALHADOS = 100
+TAMANHO_BLOCO_JSON = 64 * 1024
+
+
+class StreamingImporter:
+    def __init__(self, user, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        self.user = user
+        self.tamanho_lote = tamanho_lote
+        self.total_erros = 0
+        self.erros = []
+
+    @staticmethod
+    def detectar_formato(nome_arquivo):
+        return "json" if nome_arquivo.lower().endswith((".json", ".jsonl")) else "csv"
+
+    @staticmethod
+    def _normalizar_chave(chave):
+        return str(chave).strip().lower().replace(" ", "_")
+
+    @classmethod
+    def extrair_campos(cls, linha, aliases_campos):
+        valores = {
+            cls._normalizar_chave(chave): valor for chave, valor in linha.items()
+        }
+
+        dados = {}
+        for campo, aliases in aliases_campos.items():
+            valor = next(
+                (valores[a] for a in aliases if valores.get(a) not in (None, "")), None
+            )
+            if valor is not None:
+                dados[campo] = str(valor).strip()
+        return dados
+
+    @staticmethod
+    def ler_csv(arquivo_texto):
+        amostra = arquivo_texto.read(4096)
+        arquivo_texto.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        try:
+            yield from csv.DictReader(arquivo_texto, dialect=dialeto)
+        except csv.Error as e:
+            raise ValueError(f"CSV inválido: {e}") from e
+
+    @staticmethod
+    def ler_json(arquivo_texto):
+        decodificador = json.JSONDecoder()
+        buffer = ""
+        posicao = 0
+        dentro_de_array = None
+
+        while True:
+            bloco = arquivo_texto.read(TAMANHO_BLOCO_JSON)
+            buffer = buffer[posicao:] + bloco
+            posicao = 0
+
+            while True:
+                while posicao < len(buffer) and buffer[posicao] in " \t\r\n":
+                    posicao += 1
+                if posicao >= len(buffer):
+                    break
+
+                caractere = buffer[posicao]
+                if dentro_de_array is None:
+                    dentro_de_array = caractere == "["
+                    if dentro_de_array:
+                        posicao += 1
+                        continue
+                if dentro_de_array and caractere in ",]":
+                    posicao += 1
+                    continue
+
+                try:
+                    objeto, posicao_final = decodificador.raw_decode(buffer, posicao)
+                except json.JSONDecodeError:
+                    if not bloco:
+                        raise
+                    break
+                posicao = posicao_final
+                yield objeto
+
+            if not bloco:
+                return
+
+    def ler_linhas(self, arquivo, formato):
+        if isinstance(arquivo.read(0), bytes):
+            arquivo = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+        if formato == "json":
+            return self.ler_json(arquivo)
+        return self.ler_csv(arquivo)
+
+    def _registrar_erro(self, numero_linha, erros):
+        self.total_erros += 1
+        if len(self.erros) < MAXIMO_ERROS_DETALHADOS:
+            self.erros.append({"linha": numero_linha, "erros": erros})
@@ -0,0 +1,105 @@
+import base64
+import binascii
+from datetime import date
+
+TAMANHO_PAGINA_PADRAO = 10
+ANTERIORES = "a"
+SEGUINTES = "s"
+ULTIMA = "u"
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_previous, has_next, campo):
+        self.object_list = object_list
+        self.has_previous = has_previous
+        self.has_next = has_next
+        self.is_first = not has_previous
+        self.campo = campo
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_previous or self.has_next
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        primeiro = getattr(self.object_list[0], self.campo)
+        return KeysetPaginator.codificar(ANTERIORES, primeiro)
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        ultimo = getattr(self.object_list[-1], self.campo)
+        return KeysetPaginator.codificar(SEGUINTES, ultimo)
+
+    @property
+    def last_cursor(self):
+        return KeysetPaginator.codificar(ULTIMA) if self.has_next else None
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, campo, tamanho_pagina=TAMANHO_PAGINA_PADRAO):
+        self.queryset = queryset.order_by(f"-{campo}")
+        self.campo = campo
+        self.tamanho_pagina = tamanho_pagina
+
+    @staticmethod
+    def codificar(direcao, valor=None):
+        texto = direcao if valor is None else f"{direcao}:{valor.isoformat()}"
+        return base64.urlsafe_b64encode(texto.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decodificar(cursor):
+        try:
+            texto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direcao, _, valor = texto.decode().partition(":")
+            if direcao == ULTIMA:
+                return direcao, None
+            if direcao in (ANTERIORES, SEGUINTES):
+                return direcao, date.fromisoformat(valor)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            pass
+        return None, None
+
+    def get_page(self, cursor=None):
+        direcao, valor = self.decodificar(cursor) if cursor else (None, None)
+        limite = self.tamanho_pagina + 1
+
+        if direcao == SEGUINTES:
+            itens = list(self.queryset.filter(**{f"{self.campo}__lt": valor})[:limite])
+            return self._pagina(itens, has_previous=True)
+
+        if direcao in (ANTERIORES, ULTIMA):
+            crescente = self.queryset.reverse()
+            if direcao == ANTERIORES:
+                crescente = crescente.filter(**{f"{self.campo}__gt": valor})
+            itens = list(crescente[:limite])
+            anteriores = len(itens) > self.tamanho_pagina
+            itens = itens[: self.tamanho_pagina][::-1]
+            return KeysetPage(
+                itens,
+                has_previous=anteriores,
+                has_next=direcao == ANTERIORES,
+                campo=self.campo,
+            )
+
+        return self._pagina(list(self.queryset[:limite]), has_previous=False)
+
+    def _pagina(self, itens, has_previous):
+        return KeysetPage(
+            itens[: self.tamanho_pagina],
+            has_previous=has_previous,
+            has_next=len(itens) > self.tamanho_pagina,
+            campo=self.campo,
+        )
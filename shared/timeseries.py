@@ -0,0 +1,132 @@
+from collections import deque
+from datetime import timedelta
+
+JANELAS_MEDIA_MOVEL = (7, 14, 30)
+METODOS_MEDIA_MOVEL = ("sma", "ema")
+MAXIMO_PONTOS_PADRAO = 500
+MINIMO_PONTOS = 3
+
+
+class TimeSeriesUtils:
+
+    @staticmethod
+    def media_movel(datas, valores, janela_dias=7, casas=2):
+
+        inicio_completo = datas[0] + timedelta(days=janela_dias - 1) if datas else None
+        janela = deque()
+        soma = 0.0
+        medias = []
+
+        for data, valor in zip(datas, valores):
+            janela.append((data, valor))
+            soma += valor
+
+            limite = data - timedelta(days=janela_dias)
+            while janela[0][0] <= limite:
+                soma -= janela.popleft()[1]
+
+            if data < inicio_completo:
+                medias.append(None)
+            else:
+                medias.append(round(soma / len(janela), casas))
+
+        return medias
+
+    @staticmethod
+    def media_movel_exponencial(datas, valores, janela_dias=7, casas=2):
+
+        alfa = 2 / (janela_dias + 1)
+        inicio_completo = datas[0] + timedelta(days=janela_dias - 1) if datas else None
+        media = None
+        data_anterior = None
+        medias = []
+
+        for data, valor in zip(datas, valores):
+            if media is None:
+                media = valor
+            else:
+                peso = 1 - (1 - alfa) ** (data - data_anterior).days
+                media += peso * (valor - media)
+            data_anterior = data
+
+            medias.append(None if data < inicio_completo else round(media, casas))
+
+        return medias
+
+    @classmethod
+    def suavizar(cls, datas, valores, janela_dias=7, metodo="sma", casas=2):
+
+        if metodo == "ema":
+            return cls.media_movel_exponencial(datas, valores, janela_dias, casas)
+        return cls.media_movel(datas, valores, janela_dias, casas)
+
+    @staticmethod
+    def ler_parametros_media_movel(parametros, janela_padrao=7, metodo_padrao="sma"):
+
+        try:
+            janela = int(parametros.get("window", janela_padrao))
+        except (TypeError, ValueError):
+            janela = janela_padrao
+        if janela not in JANELAS_MEDIA_MOVEL:
+            janela = janela_padrao
+
+        metodo = parametros.get("method", metodo_padrao)
+        if metodo not in METODOS_MEDIA_MOVEL:
+            metodo = metodo_padrao
+
+        return janela, metodo
+
+    @staticmethod
+    def lttb(xs, ys, maximo_pontos):
+
+        total = len(xs)
+        if not maximo_pontos or total <= maximo_pontos:
+            return list(range(total))
+        maximo_pontos = max(maximo_pontos, MINIMO_PONTOS)
+
+        tamanho_balde = (total - 2) / (maximo_pontos - 2)
+        indices = [0]
+        anterior = 0
+
+        for balde in range(maximo_pontos - 2):
+            inicio = int(balde * tamanho_balde) + 1
+            fim = int((balde + 1) * tamanho_balde) + 1
+            proximo_fim = min(int((balde + 2) * tamanho_balde) + 1, total)
+
+            media_x = sum(xs[fim:proximo_fim]) / (proximo_fim - fim)
+            media_y = sum(ys[fim:proximo_fim]) / (proximo_fim - fim)
+            ax, ay = xs[anterior], ys[anterior]
+
+            melhor, maior_area = inicio, -1.0
+            for indice in range(inicio, fim):
+                area = abs(
+                    (ax - media_x) * (ys[indice] - ay)
+                    - (ax - xs[indice]) * (media_y - ay)
+                )
+                if area > maior_area:
+                    melhor, maior_area = indice, area
+
+            indices.append(melhor)
+            anterior = melhor
+
+        indices.append(total - 1)
+        return indices
+
+    @classmethod
+    def reduzir_por_data(cls, datas, valores, maximo_pontos):
+
+        return cls.lttb([data.toordinal() for data in datas], valores, maximo_pontos)
+
+    @staticmethod
+    def selecionar(indices, *series):
+
+        return tuple([serie[i] for i in indices] for serie in series)
+
+    @staticmethod
+    def ler_maximo_pontos(parametros, padrao=MAXIMO_PONTOS_PADRAO):
+
+        try:
+            maximo = int(parametros.get("max_points", padrao))
+        except (TypeError, ValueError):
+            return padrao
+        return max(maximo, MINIMO_PONTOS) if maximo > 0 else None
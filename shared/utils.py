@@ -1,3 +1,6 @@
+import hashlib
+from datetime import date
+
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
@@ -5,6 +8,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.contrib import messages
 from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .timeseries import TimeSeriesUtils
 
 
 class JsonResponseHelper:
@@ -304,18 +312,36 @@ class ReorderMixin:
                 filtros.update(filtros_extras)
 
             with transaction.atomic():
+                registros = {
+                    str(valor_id): (pk, ordem_atual)
+                    for valor_id, pk, ordem_atual in model_class.objects.filter(
+                        **filtros, **{f"{campo_id}__in": lista_ids}
+                    ).values_list(campo_id, "pk", campo_order)
+                }
+
+                novas_ordens = {}
                 for i, item_id in enumerate(lista_ids, 1):
-                    filtros_update = filtros.copy()
-                    filtros_update[campo_id] = item_id
-
-                    updated = model_class.objects.filter(**filtros_update).update(
-                        **{campo_order: i}
-                    )
-
-                    if updated == 0:
+                    if str(item_id) not in registros:
                         return JsonResponseHelper.erro(
                             f"Item com ID {item_id} não encontrado ou sem permissão"
                         )
+                    pk, ordem_atual = registros[str(item_id)]
+                    if ordem_atual != i:
+                        novas_ordens[pk] = i
+
+                if novas_ordens:
+                    model_class.objects.filter(pk__in=novas_ordens).update(
+                        **{
+                            campo_order: Case(
+                                *[
+                                    When(pk=pk, then=Value(ordem))
+                                    for pk, ordem in novas_ordens.items()
+                                ],
+                                default=F(campo_order),
+                                output_field=model_class._meta.get_field(campo_order),
+                            )
+                        }
+                    )
 
             return JsonResponseHelper.sucesso()
 
@@ -350,31 +376,79 @@ class ContextDataMixin:
         return metricas
 
     def preparar_dados_grafico(
-        self, queryset, campo_data, campo_valor, formato_data="%d/%m", limite_dias=30
+        self,
+        queryset,
+        campo_data,
+        campo_valor,
+        formato_data="%d/%m",
+        limite_dias=30,
+        campos_extras=None,
+        max_pontos=None,
     ):
 
         from datetime import date, timedelta
 
+        campos_extras = campos_extras or {}
+
         if limite_dias:
             data_limite = date.today() - timedelta(days=limite_dias)
             queryset = queryset.filter(**{f"{campo_data}__gte": data_limite})
 
-        queryset = queryset.order_by(campo_data)
+        registros = list(
+            queryset.order_by(campo_data).values_list(
+                campo_data, campo_valor, *campos_extras.values()
+            )
+        )
 
-        if not queryset.exists():
-            return {"labels": [], "data": [], "dates": [], "count": 0}
+        total = len(registros)
+        indices = TimeSeriesUtils.reduzir_por_data(
+            [registro[0] for registro in registros],
+            [float(registro[1]) for registro in registros],
+            max_pontos,
+        )
+        registros = [registros[indice] for indice in indices]
+
+        dados = {
+            "labels": [registro[0].strftime(formato_data) for registro in registros],
+            "data": [float(registro[1]) for registro in registros],
+            "dates": [registro[0].strftime("%Y-%m-%d") for registro in registros],
+            "count": total,
+            "downsampled": len(registros) < total,
+        }
+        for indice, chave in enumerate(campos_extras, 2):
+            dados[chave] = [float(registro[indice]) for registro in registros]
 
-        registros = list(queryset)
+        return dados
 
-        return {
-            "labels": [
-                getattr(registro, campo_data).strftime(formato_data)
-                for registro in registros
-            ],
-            "data": [float(getattr(registro, campo_valor)) for registro in registros],
-            "dates": [
-                getattr(registro, campo_data).strftime("%Y-%m-%d")
-                for registro in registros
-            ],
-            "count": len(registros),
-        }
+
+class VersionedETagMixin:
+
+    datasets_versionados = []
+    versoes_dados = {}
+
+    def calcular_etag(self, request, *args, **kwargs):
+
+        from users.models import DataVersion
+
+        versoes = DataVersion.get_versions(request.user, self.datasets_versionados)
+        self.versoes_dados = dict(zip(self.datasets_versionados, versoes))
+        conteudo = ":".join(
+            [
+                str(request.user.pk),
+                date.today().isoformat(),
+                request.get_full_path(),
+                *map(str, versoes),
+            ]
+        )
+        return hashlib.md5(conteudo.encode()).hexdigest()
+
+    def dispatch(self, request, *args, **kwargs):
+
+        if request.method not in ("GET", "HEAD") or not request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        view = condition(etag_func=self.calcular_etag)(super().dispatch)
+        response = view(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Cookie"])
+        return response
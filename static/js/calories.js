@@ -161,7 +161,118 @@ function deleteDailyLog(logId, foodName, quantity) {
     });
 }
 
+function copiarRefeicoesDeOntem(botao) {
+    AppUtils.confirmacao.acao('Copiar para hoje todos os alimentos registrados ontem?', () => {
+        AppUtils.fetch.requisicaoPost(botao.dataset.cloneUrl, {}, {
+            mensagemErroCustomizada: 'Erro ao copiar alimentos de ontem'
+        });
+    });
+}
+
+function escaparHtml(texto) {
+    const elemento = document.createElement('div');
+    elemento.textContent = texto;
+    return elemento.innerHTML;
+}
+
+function atributosAlimento(food) {
+    return `data-food-id="${food.id}" data-food-name="${escaparHtml(food.name)}" ` +
+        `data-serving-size="${food.serving_size_grams}" data-calories="${food.calories}" ` +
+        `data-protein="${food.protein}" data-carbs="${food.carbs}" data-fat="${food.fat}"`;
+}
+
+function formatarDecimal(valor, casas) {
+    return parseFloat(valor).toFixed(casas);
+}
+
+function criarCardAlimento(food) {
+    return `
+        <div class="col-12">
+            <div class="card food-card h-100" style="cursor: pointer;" ${atributosAlimento(food)} onclick="openAddFoodModalFromCard(this)">
+                <div class="card-body p-3">
+                    <h6 class="card-title mb-1">${escaparHtml(food.name)}</h6>
+                    <div class="text-muted small">
+                        <div>${food.calories} kcal | P: ${formatarDecimal(food.protein, 1)}g, C: ${formatarDecimal(food.carbs, 1)}g, F: ${formatarDecimal(food.fat, 1)}g</div>
+                        <div class="mt-1">Porção: ${formatarDecimal(food.serving_size_grams, 0)}g</div>
+                    </div>
+                </div>
+            </div>
+        </div>`;
+}
+
+function criarItemGerenciamentoAlimento(food) {
+    return `
+        <div class="list-group-item d-flex justify-content-between align-items-center p-2">
+            <div>
+                <strong>${escaparHtml(food.name)}</strong>
+                <div class="text-muted small">${food.calories} kcal (${formatarDecimal(food.serving_size_grams, 0)}g)</div>
+            </div>
+            <div>
+                ${food.is_recipe
+                    ? '<span class="badge bg-info text-dark me-1" title="Edite a receita para alterar este alimento">Receita</span>'
+                    : `<button type="button" class="btn btn-sm btn-outline-secondary me-1" ${atributosAlimento(food)} onclick="editFoodFromButton(this)">
+                    <i class="bi bi-pencil"></i>
+                </button>`}
+                <button type="button" class="btn btn-sm btn-outline-danger" data-food-id="${food.id}" data-food-name="${escaparHtml(food.name)}" onclick="deleteFoodFromButton(this)">
+                    <i class="bi bi-trash"></i>
+                </button>
+            </div>
+        </div>`;
+}
+
+async function buscarAlimentos(termo, pagina = 1) {
+    const campoBusca = document.getElementById('food-search');
+    const url = new URL(campoBusca.dataset.searchUrl, window.location.origin);
+    url.searchParams.set('q', termo);
+    url.searchParams.set('page', pagina);
+
+    const response = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+    const data = await response.json();
+    if (!data.success) {
+        throw new Error(data.error || 'Erro ao buscar alimentos');
+    }
+
+    const cards = document.getElementById('food-cards');
+    const lista = document.getElementById('food-management-list');
+    const htmlCards = data.foods.map(criarCardAlimento).join('');
+    const htmlLista = data.foods.map(criarItemGerenciamentoAlimento).join('');
+
+    if (pagina === 1) {
+        cards.innerHTML = htmlCards || '<div class="col-12"><p class="text-muted text-center">Nenhum alimento encontrado.</p></div>';
+        lista.innerHTML = htmlLista || '<div class="list-group-item text-center text-muted">Nenhum alimento encontrado</div>';
+    } else {
+        cards.insertAdjacentHTML('beforeend', htmlCards);
+        lista.insertAdjacentHTML('beforeend', htmlLista);
+    }
+
+    const botaoMais = document.getElementById('load-more-foods');
+    botaoMais.dataset.nextPage = data.page + 1;
+    botaoMais.style.display = data.has_next ? '' : 'none';
+}
+
+function configurarBuscaAlimentos() {
+    const campoBusca = document.getElementById('food-search');
+    const botaoMais = document.getElementById('load-more-foods');
+    if (!campoBusca || !botaoMais) {
+        return;
+    }
+
+    let timeoutBusca;
+    campoBusca.addEventListener('input', function() {
+        clearTimeout(timeoutBusca);
+        timeoutBusca = setTimeout(() => {
+            buscarAlimentos(campoBusca.value.trim()).catch(error => console.error(error));
+        }, 300);
+    });
+
+    botaoMais.addEventListener('click', function() {
+        const proximaPagina = parseInt(botaoMais.dataset.nextPage, 10) || 2;
+        buscarAlimentos(campoBusca.value.trim(), proximaPagina).catch(error => console.error(error));
+    });
+}
+
 AppUtils.entidades.inicializarScriptPadrao('calories.js', {
+    copiarRefeicoesDeOntem,
     deleteFoodFromButton,
     editDailyLogFromButton,
     editFoodFromButton,
@@ -197,6 +308,8 @@ AppUtils.entidades.inicializarScriptPadrao('calories.js', {
     }
 ], function() {
 
+    configurarBuscaAlimentos();
+
     AppUtils.sortable.configurarReordenacao('food-list', {
         url: '/tracker/daily-log/reorder/',
         atributoId: 'data-food-id',
@@ -21,26 +21,27 @@ const selectExerciseCardFromCard = typeof AppUtils !== 'undefined' ?
         console.error('AppUtils não disponível para selectExerciseCardFromCard');
     };
 
-function processarDadosProgresso(dadosGrafico) {
-    if (!dadosGrafico.datasets || dadosGrafico.datasets.length === 0) return null;
-
-    const series = dadosGrafico.datasets.map(function(dataset) {
-        return {
-            name: dataset.label,
-            data: dataset.data.map(function(point) {
-                return [Date.parse(point.x), point.y];
-            }),
-            color: dataset.borderColor,
-            marker: {
-                fillColor: dataset.borderColor,
-                lineWidth: 2,
-                lineColor: '#ffffff',
-                radius: dataset.pointRadius || 4
-            },
-            lineWidth: dataset.borderWidth || 2,
-            dashStyle: dataset.borderDash ? 'dash' : 'solid'
-        };
+const PARAMETROS_GRAFICO_PROGRESSO = ['formula', 'max_points'];
+
+function urlGraficoProgresso(elementoGrafico) {
+    const parametrosPagina = new URLSearchParams(window.location.search);
+    const parametros = new URLSearchParams({
+        exercise: elementoGrafico.dataset.exercise,
+        period: elementoGrafico.dataset.period || '90'
+    });
+    PARAMETROS_GRAFICO_PROGRESSO.forEach(nome => {
+        if (parametrosPagina.has(nome)) {
+            parametros.set(nome, parametrosPagina.get(nome));
+        }
     });
+    return `${elementoGrafico.dataset.url}?${parametros.toString()}`;
+}
+
+function processarDadosProgresso(dados) {
+    if (!dados.dates || dados.dates.length === 0) return null;
+
+    const datas = dados.dates.map(data => Date.parse(data));
+    const coluna = valores => datas.map((data, i) => [data, valores[i]]);
 
     const configuracaoBase = AppUtils.graficos.criarConfiguracaoBase({
         titulo: 'Progressão do Exercício',
@@ -51,21 +52,50 @@ function processarDadosProgresso(dadosGrafico) {
 
     return {
         ...configuracaoBase,
+        yAxis: [
+            configuracaoBase.yAxis,
+            {
+                ...configuracaoBase.yAxis,
+                title: { ...configuracaoBase.yAxis.title, text: 'Tonelagem (kg)' },
+                gridLineWidth: 0,
+                opposite: true
+            }
+        ],
         tooltip: {
             ...configuracaoBase.tooltip,
+            shared: true,
             formatter: function() {
-                const date = new Date(this.x).toLocaleDateString('pt-BR');
-                return `<b>${this.series.name}</b><br/>Data: ${date}<br/>Peso: ${this.y} kg`;
+                const i = this.points[0].point.index;
+                const data = new Date(this.x).toLocaleDateString('pt-BR');
+                return `<b>${data}</b><br/>` +
+                    `1RM estimado (${dados.formula}): ${dados.e1rm[i]} kg<br/>` +
+                    `Melhor série: ${dados.best_weight[i]} kg x ${dados.best_reps[i]}<br/>` +
+                    `Tonelagem: ${dados.tonnage[i]} kg<br/>` +
+                    `Séries: ${dados.sets[i]} • Reps: ${dados.reps[i]}`;
             }
         },
-        plotOptions: {
-            ...configuracaoBase.plotOptions,
-            line: {
-                ...configuracaoBase.plotOptions.line,
-                connectNulls: false
+        series: [
+            {
+                name: 'Tonelagem',
+                type: 'column',
+                yAxis: 1,
+                data: coluna(dados.tonnage),
+                color: 'rgba(108, 117, 125, 0.5)',
+                borderWidth: 0
+            },
+            {
+                name: '1RM Estimado',
+                data: coluna(dados.e1rm),
+                color: '#dc3545',
+                lineWidth: 3
+            },
+            {
+                name: 'Peso da Melhor Série',
+                data: coluna(dados.best_weight),
+                color: '#007bff',
+                dashStyle: 'dash'
             }
-        },
-        series: series
+        ]
     };
 }
 
@@ -81,7 +111,10 @@ function changePeriod(period) {
 }
 
 function initExerciseProgressChart() {
-    return AppUtils.graficos.inicializarComProcessamento('progressChart', 'chart-data', {
+    const elementoGrafico = document.getElementById('progressChart');
+    if (!elementoGrafico) return null;
+
+    return AppUtils.graficos.inicializarDeUrl('progressChart', urlGraficoProgresso(elementoGrafico), {
         processadorDados: processarDadosProgresso
     });
 }
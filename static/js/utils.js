@@ -803,6 +803,34 @@ const AppUtils = {
                 return null;
             }
 
+            return this.renderizarComProcessamento(elementoGraficoId, dadosGrafico, configuracao);
+        },
+
+        async inicializarDeUrl(elementoGraficoId, url, configuracao = {}) {
+            if (typeof Highcharts === 'undefined') {
+                console.warn('Highcharts não está disponível para inicializar gráfico');
+                return null;
+            }
+
+            let dadosGrafico;
+            try {
+                const response = await fetch(url, {
+                    credentials: 'same-origin',
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                });
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                dadosGrafico = await response.json();
+            } catch (error) {
+                console.error('Erro ao carregar dados do gráfico:', error);
+                return null;
+            }
+
+            return this.renderizarComProcessamento(elementoGraficoId, dadosGrafico, configuracao);
+        },
+
+        renderizarComProcessamento(elementoGraficoId, dadosGrafico, configuracao = {}) {
             if (configuracao.processadorDados && typeof configuracao.processadorDados === 'function') {
                 dadosGrafico = configuracao.processadorDados(dadosGrafico);
             }
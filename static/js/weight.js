@@ -1,5 +1,22 @@
+const PARAMETROS_GRAFICO_PESO = ['window', 'method', 'max_points', 'granularity'];
+const UNIDADES_GRANULARIDADE = { day: 'dias', week: 'semanas', month: 'meses' };
+
+function urlGraficoPeso(elementoGrafico) {
+    const parametrosPagina = new URLSearchParams(window.location.search);
+    const parametros = new URLSearchParams({ days: elementoGrafico.dataset.days || '365' });
+    PARAMETROS_GRAFICO_PESO.forEach(nome => {
+        if (parametrosPagina.has(nome)) {
+            parametros.set(nome, parametrosPagina.get(nome));
+        }
+    });
+    return `${elementoGrafico.dataset.url}?${parametros.toString()}`;
+}
+
 function initWeightChart() {
-    return AppUtils.graficos.inicializarComProcessamento('weightChart', 'chart-data', {
+    const elementoGrafico = document.getElementById('weightChart');
+    if (!elementoGrafico) return null;
+
+    return AppUtils.graficos.inicializarDeUrl('weightChart', urlGraficoPeso(elementoGrafico), {
         processadorDados: function(dadosGrafico) {
             if (!dadosGrafico.data || dadosGrafico.data.length === 0) return null;
 
@@ -11,8 +28,11 @@ function initWeightChart() {
             }];
 
             if (dadosGrafico.moving_average && dadosGrafico.moving_average.some(val => val !== null)) {
+                const janela = `${dadosGrafico.moving_average_window} ${UNIDADES_GRANULARIDADE[dadosGrafico.granularity] || 'dias'}`;
                 series.push({
-                    name: 'Média Móvel (7 dias)',
+                    name: dadosGrafico.moving_average_method === 'ema'
+                        ? `Média Móvel Exponencial (${janela})`
+                        : `Média Móvel (${janela})`,
                     data: dadosGrafico.moving_average,
                     color: '#28a745',
                     dashStyle: 'dash',
@@ -194,6 +194,27 @@ AppUtils.scripts.inicializar('workout.js', {
     });
 });
 
+function atualizarBadgeRecorde(card, badgeContainer, recordes) {
+    const badgeAtual = card.querySelector('.pr-badge');
+    if (badgeAtual) {
+        badgeAtual.remove();
+    }
+    if (recordes.length === 0) {
+        return;
+    }
+
+    const badge = document.createElement('span');
+    badge.className = 'badge bg-warning text-dark me-2 pr-badge';
+    badge.title = `Recorde pessoal: ${recordes.join(', ')}`;
+    badge.innerHTML = '<i class="bi bi-trophy-fill"></i> PR';
+    const registrada = badgeContainer.querySelector('.badge.bg-success');
+    if (registrada) {
+        registrada.after(badge);
+    } else {
+        badgeContainer.prepend(badge);
+    }
+}
+
 function autoSaveSet(form) {
     const sessionId = form.dataset.sessionId;
     const exerciseId = form.dataset.exerciseId;
@@ -232,16 +253,16 @@ function autoSaveSet(form) {
     const url = `/logbook/treino/${sessionId}/log/${exerciseId}/${setNumber}/`;
 
     AppUtils.fetch.requisicaoPost(url, formData, {
-        onSucesso: () => {
+        onSucesso: (dados) => {
             AppUtils.ui.mostrarIndicadorCarregamento(savingIndicator, false);
             saveFeedback.style.display = 'block';
             const card = form.closest('.card');
             card.classList.add('bg-success', 'bg-opacity-10');
-            const badge = card.querySelector('.badge');
-            if (!badge) {
-                const badgeContainer = card.querySelector('.d-flex.align-items-center');
+            const badgeContainer = card.querySelector('.d-flex.align-items-center');
+            if (!card.querySelector('.badge.bg-success')) {
                 badgeContainer.insertAdjacentHTML('afterbegin', '<span class="badge bg-success me-2">Registrada</span>');
             }
+            atualizarBadgeRecorde(card, badgeContainer, (dados && dados.records) || []);
         },
         onErro: () => {
             AppUtils.ui.mostrarIndicadorCarregamento(savingIndicator, false);
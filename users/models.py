@@ -1 +1,49 @@
-# Create your models here.
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+
+User = get_user_model()
+
+
+class DataVersion(models.Model):
+    DATASET_CHOICES = [
+        ("weight", "Peso"),
+        ("workouts", "Treinos"),
+        ("daily_log", "Diário alimentar"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="data_versions"
+    )
+    dataset = models.CharField(max_length=20, choices=DATASET_CHOICES)
+    version = models.PositiveIntegerField(
+        default=0, help_text="Incrementada a cada escrita nos dados do conjunto"
+    )
+
+    class Meta:
+        unique_together = ["user", "dataset"]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.dataset} v{self.version}"
+
+    @classmethod
+    def get_versions(cls, user, datasets):
+        versoes = dict(
+            cls.objects.filter(user=user, dataset__in=datasets).values_list(
+                "dataset", "version"
+            )
+        )
+        return [versoes.get(dataset, 0) for dataset in datasets]
+
+    @classmethod
+    def bump(cls, user, *datasets):
+        user_id = getattr(user, "pk", user)
+        for dataset in datasets:
+            versoes = cls.objects.filter(user_id=user_id, dataset=dataset)
+            if versoes.update(version=F("version") + 1):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, dataset=dataset, version=1)
+            except IntegrityError:
+                versoes.update(version=F("version") + 1)
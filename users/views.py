@@ -1,7 +1,11 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 
+from calories.models import TDEEEstimate
+
 
 @login_required
 def home(request):
-    return render(request, "users/home.html")
+    return render(
+        request, "users/home.html", {"tdee": TDEEEstimate.for_user(request.user)}
+    )
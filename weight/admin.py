@@ -9,3 +9,7 @@ class WeightEntryAdmin(admin.ModelAdmin):
     search_fields = ["user__username"]
     date_hierarchy = "date"
     ordering = ["-date"]
+
+    def delete_queryset(self, request, queryset):
+        for entry in queryset:
+            entry.delete()
@@ -0,0 +1,164 @@
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+
+from calories.models import TDEEEstimate
+from shared.importers import StreamingImporter, TAMANHO_LOTE_PADRAO
+from users.models import DataVersion
+from .models import WeightEntry, WeightRollup
+
+ALIASES_CAMPOS = {
+    "date": ["date", "data", "dia", "day", "datetime", "timestamp", "time"],
+    "weight_kg": ["weight_kg", "weight", "peso", "peso_kg", "kg", "weight_(kg)"],
+    "weight_lb": ["weight_lb", "weight_lbs", "lb", "lbs", "weight_(lb)"],
+}
+
+FORMATOS_DATA = ["%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y", "%d.%m.%Y"]
+KG_POR_LIBRA = Decimal("0.45359237")
+CENTESIMO = Decimal("0.01")
+PESO_MAXIMO_KG = Decimal("999.99")
+TIMESTAMP_MAXIMO_SEGUNDOS = 10**11
+
+
+class WeightImporter(StreamingImporter):
+    def __init__(self, user, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        super().__init__(user, tamanho_lote)
+        self.inseridos = 0
+        self.atualizados = 0
+        self.ignorados = 0
+        self.datas_alteradas = set()
+
+    @classmethod
+    def mapear_linha(cls, linha):
+        return cls.extrair_campos(linha, ALIASES_CAMPOS)
+
+    @staticmethod
+    def converter_data(texto):
+        if not texto:
+            raise ValueError("Data não informada")
+        if texto.isdigit():
+            segundos = int(texto)
+            if segundos > TIMESTAMP_MAXIMO_SEGUNDOS:
+                segundos //= 1000
+            return datetime.fromtimestamp(segundos).date()
+
+        try:
+            return datetime.fromisoformat(texto.replace("Z", "+00:00")).date()
+        except ValueError:
+            pass
+
+        texto = texto.split()[0]
+        for formato in FORMATOS_DATA:
+            try:
+                return datetime.strptime(texto, formato).date()
+            except ValueError:
+                continue
+        raise ValueError("Data inválida")
+
+    @staticmethod
+    def converter_peso(dados):
+        if "weight_kg" in dados:
+            valor, fator = dados["weight_kg"], Decimal(1)
+        elif "weight_lb" in dados:
+            valor, fator = dados["weight_lb"], KG_POR_LIBRA
+        else:
+            raise ValueError("Peso não informado")
+
+        try:
+            peso = (Decimal(valor.replace(",", ".")) * fator).quantize(
+                CENTESIMO, rounding=ROUND_HALF_UP
+            )
+        except InvalidOperation:
+            raise ValueError("Peso inválido")
+        if not 0 < peso <= PESO_MAXIMO_KG:
+            raise ValueError("Peso fora do intervalo permitido")
+        return peso
+
+    def validar_linha(self, dados):
+        limpos, erros = {}, {}
+        try:
+            limpos["date"] = self.converter_data(dados.get("date", ""))
+        except (ValueError, OverflowError, OSError) as e:
+            erros["date"] = [str(e)]
+        try:
+            limpos["weight_kg"] = self.converter_peso(dados)
+        except ValueError as e:
+            erros["weight_kg"] = [str(e)]
+        return limpos, erros
+
+    def _salvar_lote(self, lote):
+        if not lote:
+            return
+
+        existentes = dict(
+            WeightEntry.objects.filter(user=self.user, date__in=lote).values_list(
+                "date", "weight_kg"
+            )
+        )
+        alterados = []
+        for data, peso in lote.items():
+            if data not in existentes:
+                self.inseridos += 1
+            elif existentes[data] != peso:
+                self.atualizados += 1
+            else:
+                self.ignorados += 1
+                continue
+            alterados.append(WeightEntry(user=self.user, date=data, weight_kg=peso))
+
+        with transaction.atomic():
+            WeightEntry.objects.bulk_create(
+                alterados,
+                update_conflicts=True,
+                unique_fields=["user", "date"],
+                update_fields=["weight_kg"],
+            )
+        self.datas_alteradas.update(entry.date for entry in alterados)
+        lote.clear()
+
+    def _atualizar_derivados(self):
+        if not self.datas_alteradas:
+            return
+
+        primeira, ultima = min(self.datas_alteradas), max(self.datas_alteradas)
+        with transaction.atomic():
+            WeightRollup.refresh_range(self.user, primeira, ultima)
+            DataVersion.bump(self.user, "weight")
+            TDEEEstimate.register_day(self.user, primeira)
+
+    def importar(self, arquivo, formato="csv"):
+        lote = {}
+
+        try:
+            for numero_linha, linha in enumerate(self.ler_linhas(arquivo, formato), 1):
+                if not isinstance(linha, dict):
+                    self._registrar_erro(numero_linha, {"__all__": ["Linha inválida"]})
+                    continue
+
+                dados, erros = self.validar_linha(self.mapear_linha(linha))
+                if erros:
+                    self._registrar_erro(numero_linha, erros)
+                    continue
+
+                if dados["date"] in lote:
+                    self.ignorados += 1
+                lote[dados["date"]] = dados["weight_kg"]
+
+                if len(lote) >= self.tamanho_lote:
+                    self._salvar_lote(lote)
+
+            self._salvar_lote(lote)
+        finally:
+            self._atualizar_derivados()
+
+        return self.resultado()
+
+    def resultado(self):
+        return {
+            "inseridos": self.inseridos,
+            "atualizados": self.atualizados,
+            "ignorados": self.ignorados + self.total_erros,
+            "total_erros": self.total_erros,
+            "erros": self.erros,
+        }
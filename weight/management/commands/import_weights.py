@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from weight.importers import TAMANHO_LOTE_PADRAO, WeightImporter
+
+
+class Command(BaseCommand):
+    help = "Importa pesagens exportadas de balanças ou outros apps em CSV ou JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo CSV ou JSON")
+        parser.add_argument(
+            "--user", required=True, help="Username do dono das pesagens"
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "json"],
+            help="Formato do arquivo (detectado pela extensão se omitido)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TAMANHO_LOTE_PADRAO,
+            help="Número de pesagens gravadas por transação",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f'Usuário "{options["user"]}" não encontrado.')
+
+        formato = options["format"] or WeightImporter.detectar_formato(
+            options["arquivo"]
+        )
+        importador = WeightImporter(user, tamanho_lote=options["batch_size"])
+
+        try:
+            with open(options["arquivo"], "rb") as arquivo:
+                resultado = importador.importar(arquivo, formato)
+        except OSError as e:
+            raise CommandError(f"Erro ao abrir arquivo: {e}")
+        except ValueError as e:
+            raise CommandError(
+                f"Arquivo inválido após {importador.inseridos} pesagem(ns) "
+                f"inserida(s) e {importador.atualizados} atualizada(s): {e}"
+            )
+
+        for erro in resultado["erros"]:
+            self.stdout.write(f"Linha {erro['linha']}: {erro['erros']}")
+        if resultado["total_erros"] > len(resultado["erros"]):
+            self.stdout.write(
+                f"... e mais {resultado['total_erros'] - len(resultado['erros'])} "
+                f"linha(s) com erro."
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado['inseridos']} pesagem(ns) inserida(s), "
+                f"{resultado['atualizados']} atualizada(s), "
+                f"{resultado['ignorados']} ignorada(s)."
+            )
+        )
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.models import DataVersion
+
+from weight.models import WeightEntry, WeightRollup
+
+CAMPOS_ROLLUP = ["entries_count", "total_kg", "min_kg", "max_kg"]
+
+
+class Command(BaseCommand):
+    help = "Reconstrói ou verifica os agregados semanais e mensais de peso"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Apenas compara os agregados com as pesagens, sem alterar nada",
+        )
+        parser.add_argument(
+            "--user", help="Restringe a operação ao usuário com este username"
+        )
+
+    def handle(self, *args, **options):
+        entries = WeightEntry.objects.all()
+        rollups = WeightRollup.objects.all()
+
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f'Usuário "{options["user"]}" não encontrado.')
+            entries = entries.filter(user=user)
+            rollups = rollups.filter(user=user)
+
+        esperados = WeightRollup.expected_rollups(entries)
+
+        if options["verify"]:
+            self._verificar(esperados, rollups)
+        else:
+            self._reconstruir(esperados, rollups)
+
+    def _verificar(self, esperados, rollups):
+        atuais = {
+            (linha.pop("user"), linha.pop("granularity"), linha.pop("period_start")): (
+                linha
+            )
+            for linha in rollups.values(
+                "user", "granularity", "period_start", *CAMPOS_ROLLUP
+            )
+        }
+
+        divergencias = 0
+        for chave in sorted(set(esperados) | set(atuais)):
+            esperado = esperados.get(chave)
+            atual = atuais.get(chave)
+            if esperado != atual:
+                divergencias += 1
+                user_id, granularidade, inicio = chave
+                self.stdout.write(
+                    f"Usuário {user_id}, {granularidade} de {inicio}: "
+                    f"esperado {esperado}, encontrado {atual}"
+                )
+
+        if divergencias:
+            raise CommandError(f"{divergencias} período(s) com agregado divergente.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(esperados)} período(s) verificados, sem divergências."
+            )
+        )
+
+    def _reconstruir(self, esperados, rollups):
+        novos = [
+            WeightRollup(
+                user_id=user_id,
+                granularity=granularidade,
+                period_start=inicio,
+                **totais,
+            )
+            for (user_id, granularidade, inicio), totais in esperados.items()
+        ]
+
+        usuarios = {user_id for user_id, _, _ in esperados}
+        usuarios.update(rollups.values_list("user", flat=True).distinct())
+
+        with transaction.atomic():
+            rollups.delete()
+            WeightRollup.objects.bulk_create(novos, batch_size=500)
+            for user_id in usuarios:
+                DataVersion.bump(user_id, "weight")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(novos)} agregado(s) de peso reconstruídos.")
+        )
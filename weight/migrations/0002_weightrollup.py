@@ -0,0 +1,114 @@
+# Generated by Django 6.1.2 on 2026-10-18 07:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def invalidar_versoes(apps, user_ids):
+    DataVersion = apps.get_model("users", "DataVersion")
+    DataVersion.objects.filter(user_id__in=user_ids, dataset="weight").update(
+        version=F("version") + 1
+    )
+    existentes = set(
+        DataVersion.objects.filter(user_id__in=user_ids, dataset="weight").values_list(
+            "user_id", flat=True
+        )
+    )
+    DataVersion.objects.bulk_create(
+        [
+            DataVersion(user_id=user_id, dataset="weight", version=1)
+            for user_id in set(user_ids) - existentes
+        ]
+    )
+
+
+def preencher_agregados(apps, schema_editor):
+    WeightEntry = apps.get_model("weight", "WeightEntry")
+    WeightRollup = apps.get_model("weight", "WeightRollup")
+
+    novos = []
+    for granularidade, funcao in (("week", TruncWeek), ("month", TruncMonth)):
+        linhas = (
+            WeightEntry.objects.order_by()
+            .annotate(period_start=funcao("date"))
+            .values("user", "period_start")
+            .annotate(
+                entries_count=Count("id"),
+                total_kg=Sum("weight_kg"),
+                min_kg=Min("weight_kg"),
+                max_kg=Max("weight_kg"),
+            )
+        )
+        novos.extend(
+            WeightRollup(user_id=linha.pop("user"), granularity=granularidade, **linha)
+            for linha in linhas
+        )
+
+    WeightRollup.objects.bulk_create(novos, batch_size=500)
+    invalidar_versoes(apps, {rollup.user_id for rollup in novos})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("weight", "0001_initial"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeightRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("week", "Semana"), ("month", "Mês")], max_length=5
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateField(help_text="Primeiro dia da semana ou do mês"),
+                ),
+                (
+                    "entries_count",
+                    models.PositiveIntegerField(help_text="Pesagens no período"),
+                ),
+                (
+                    "total_kg",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Soma das pesagens do período",
+                        max_digits=9,
+                    ),
+                ),
+                ("min_kg", models.DecimalField(decimal_places=2, max_digits=5)),
+                ("max_kg", models.DecimalField(decimal_places=2, max_digits=5)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weight_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["period_start"],
+                "unique_together": {("user", "granularity", "period_start")},
+            },
+        ),
+        migrations.RunPython(preencher_agregados, migrations.RunPython.noop),
+    ]
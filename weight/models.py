@@ -1,10 +1,21 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models import Max, Min
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from bisect import bisect_left
 from datetime import date, timedelta
 
+from shared.timeseries import TimeSeriesUtils
+from users.models import DataVersion
+from .trend import JANELA_PADRAO_TENDENCIA, WeightTrend
+
 User = get_user_model()
 
+LABEL_FORMATS = {"day": "%d/%m", "week": "%d/%m/%Y", "month": "%m/%Y"}
+DIAS_POR_PERIODO = {"day": 1, "week": 7, "month": 30}
+TEMPO_CACHE_METRICAS = 60 * 60
+
 
 class WeightEntry(models.Model):
     user = models.ForeignKey(
@@ -22,11 +33,78 @@ class WeightEntry(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.weight_kg}kg em {self.date}"
 
+    def save(self, *args, **kwargs):
+        data_anterior = None
+        if self.pk:
+            data_anterior = (
+                WeightEntry.objects.filter(pk=self.pk)
+                .values_list("date", flat=True)
+                .first()
+            )
+        super().save(*args, **kwargs)
+        self._registrar_alteracao(data_anterior)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        self._registrar_alteracao()
+        return resultado
+
+    def _registrar_alteracao(self, data_anterior=None):
+        from calories.models import TDEEEstimate
+
+        DataVersion.bump(self.user_id, "weight")
+        data = self.date
+        if isinstance(data, str):
+            data = date.fromisoformat(data)
+        datas = {data, data_anterior} - {None}
+        WeightRollup.refresh_periods(self.user_id, datas)
+        TDEEEstimate.register_day(self.user_id, min(datas))
+
+    @staticmethod
+    def data_version(user):
+        (versao,) = DataVersion.get_versions(user, ["weight"])
+        return versao
+
+    @staticmethod
+    def metrics_cache_key(user_id, versao):
+        return f"weight:metrics:{user_id}:v{versao}"
+
+    @staticmethod
+    def trend_cache_key(user_id, hoje, versao):
+        return f"weight:trend:{user_id}:v{versao}:{hoje.isoformat()}"
+
     @classmethod
-    def get_user_metrics(cls, user):
-        entries = cls.objects.filter(user=user)
+    def get_user_metrics(cls, user, versao=None):
+        if versao is None:
+            versao = cls.data_version(user)
+        chave = cls.metrics_cache_key(getattr(user, "pk", user), versao)
+        metrics = cache.get(chave)
+        if metrics is None:
+            metrics = cls._calculate_user_metrics(user)
+            cache.set(chave, metrics, TEMPO_CACHE_METRICAS)
+        return metrics
+
+    @classmethod
+    def _calculate_user_metrics(cls, user):
+        peso_atual = (
+            cls.objects.filter(user=OuterRef("user"))
+            .order_by("-date")
+            .values("weight_kg")[:1]
+        )
+        aggregates = (
+            cls.objects.filter(user=user)
+            .order_by()
+            .values("user")
+            .annotate(
+                current_weight=Subquery(peso_atual),
+                max_weight=Max("weight_kg"),
+                min_weight=Min("weight_kg"),
+                entries_count=Count("id"),
+            )
+            .first()
+        )
 
-        if not entries.exists():
+        if aggregates is None:
             return {
                 "current_weight": None,
                 "max_weight": None,
@@ -34,77 +112,241 @@ class WeightEntry(models.Model):
                 "entries_count": 0,
             }
 
-        latest_entry = entries.first()
-        current_weight = latest_entry.weight_kg
-
-        aggregates = entries.aggregate(
-            max_weight=Max("weight_kg"), min_weight=Min("weight_kg")
-        )
-
         return {
-            "current_weight": round(float(current_weight), 1),
+            "current_weight": round(float(aggregates["current_weight"]), 1),
             "max_weight": round(float(aggregates["max_weight"]), 1),
             "min_weight": round(float(aggregates["min_weight"]), 1),
-            "entries_count": entries.count(),
+            "entries_count": aggregates["entries_count"],
         }
 
     @classmethod
-    def get_chart_data(cls, user, days_limit=30):
+    def get_trend(cls, user, days_limit=JANELA_PADRAO_TENDENCIA, versao=None):
+        if versao is None:
+            versao = cls.data_version(user)
+        hoje = date.today()
+        chave = cls.trend_cache_key(getattr(user, "pk", user), hoje, versao)
+        ajustes = cache.get(chave) or {}
+        if days_limit not in ajustes:
+            rows = (
+                cls.objects.filter(
+                    user=user, date__gte=hoje - timedelta(days=days_limit)
+                )
+                .order_by("date")
+                .values_list("date", "weight_kg")
+            )
+            ajustes[days_limit] = WeightTrend.ajustar(
+                [row[0] for row in rows], [float(row[1]) for row in rows]
+            )
+            cache.set(chave, ajustes, TEMPO_CACHE_METRICAS)
+        return ajustes[days_limit]
+
+    @staticmethod
+    def chart_granularity(days_limit):
+        if days_limit > 3 * 365:
+            return "month"
+        if days_limit > 365:
+            return "week"
+        return "day"
+
+    @classmethod
+    def _load_series(cls, user, start_date, granularity):
+        if granularity == "day":
+            rows = (
+                cls.objects.filter(user=user, date__gte=start_date)
+                .order_by("date")
+                .values_list("date", "weight_kg")
+            )
+            return [row[0] for row in rows], [float(row[1]) for row in rows]
+
+        rows = (
+            WeightRollup.objects.filter(
+                user=user,
+                granularity=granularity,
+                period_start__gte=WeightRollup.period_start_for(
+                    granularity, start_date
+                ),
+            )
+            .order_by("period_start")
+            .values_list("period_start", "total_kg", "entries_count")
+        )
+        return (
+            [row[0] for row in rows],
+            [round(float(row[1]) / row[2], 2) for row in rows],
+        )
+
+    @classmethod
+    def get_chart_data(
+        cls,
+        user,
+        days_limit=30,
+        window_days=7,
+        method="sma",
+        max_points=None,
+        granularity=None,
+    ):
+        granularity = granularity or cls.chart_granularity(days_limit)
+        janela_dias = window_days * DIAS_POR_PERIODO[granularity]
         start_date = date.today() - timedelta(days=days_limit)
-        entries = cls.objects.filter(user=user, date__gte=start_date).order_by("date")
+        warmup_date = start_date - timedelta(days=janela_dias - 1)
+        all_dates, all_weights = cls._load_series(user, warmup_date, granularity)
+        moving_average = TimeSeriesUtils.suavizar(
+            all_dates, all_weights, janela_dias=janela_dias, metodo=method
+        )
+
+        inicio = bisect_left(all_dates, start_date)
+        dates_list = all_dates[inicio:]
+        data = all_weights[inicio:]
+        moving_average = moving_average[inicio:]
+        ajuste = WeightTrend.ajustar(dates_list, data)
+        weekly_rate = ajuste["weekly_rate"] if ajuste else None
+        count = len(dates_list)
+
+        indices = TimeSeriesUtils.reduzir_por_data(dates_list, data, max_points)
+        dates_list, data, moving_average = TimeSeriesUtils.selecionar(
+            indices, dates_list, data, moving_average
+        )
 
-        if not entries.exists():
+        if not dates_list:
             return {
                 "labels": [],
                 "data": [],
                 "dates": [],
                 "moving_average": [],
+                "moving_average_window": window_days,
+                "moving_average_method": method,
+                "granularity": granularity,
                 "weekly_rate": None,
+                "count": 0,
+                "downsampled": False,
             }
 
-        entries_list = list(entries)
-        labels = [entry.date.strftime("%d/%m") for entry in entries_list]
-        data = [float(entry.weight_kg) for entry in entries_list]
-        dates = [entry.date.strftime("%Y-%m-%d") for entry in entries_list]
-
-        moving_average = cls._calculate_moving_average(entries_list)
-        weekly_rate = cls._calculate_weekly_rate(entries_list)
-
         return {
-            "labels": labels,
+            "labels": [d.strftime(LABEL_FORMATS[granularity]) for d in dates_list],
             "data": data,
-            "dates": dates,
+            "dates": [d.strftime("%Y-%m-%d") for d in dates_list],
             "moving_average": moving_average,
+            "moving_average_window": window_days,
+            "moving_average_method": method,
+            "granularity": granularity,
             "weekly_rate": weekly_rate,
-            "count": len(entries_list),
+            "count": count,
+            "downsampled": len(dates_list) < count,
         }
 
-    @classmethod
-    def _calculate_moving_average(cls, entries_list):
-        moving_average = []
-        for i, entry in enumerate(entries_list):
-            if i < 6:
-                moving_average.append(None)
-            else:
-                recent_weights = [
-                    float(entries_list[j].weight_kg) for j in range(i - 6, i + 1)
-                ]
-                avg = sum(recent_weights) / len(recent_weights)
-                moving_average.append(round(avg, 2))
-        return moving_average
+
+class WeightRollup(models.Model):
+    GRANULARITY_CHOICES = [
+        ("week", "Semana"),
+        ("month", "Mês"),
+    ]
+    PERIOD_FUNCTIONS = {"week": TruncWeek, "month": TruncMonth}
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="weight_rollups"
+    )
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period_start = models.DateField(help_text="Primeiro dia da semana ou do mês")
+    entries_count = models.PositiveIntegerField(help_text="Pesagens no período")
+    total_kg = models.DecimalField(
+        max_digits=9, decimal_places=2, help_text="Soma das pesagens do período"
+    )
+    min_kg = models.DecimalField(max_digits=5, decimal_places=2)
+    max_kg = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        ordering = ["period_start"]
+        unique_together = ["user", "granularity", "period_start"]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.granularity} {self.period_start}"
+
+    @property
+    def avg_kg(self):
+        return self.total_kg / self.entries_count
+
+    @staticmethod
+    def period_start_for(granularity, day):
+        if granularity == "month":
+            return day.replace(day=1)
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def period_end_for(granularity, start):
+        if granularity == "month":
+            return (start + timedelta(days=32)).replace(day=1)
+        return start + timedelta(days=7)
+
+    @staticmethod
+    def aggregates():
+        return {
+            "entries_count": Count("id"),
+            "total_kg": Sum("weight_kg"),
+            "min_kg": Min("weight_kg"),
+            "max_kg": Max("weight_kg"),
+        }
 
     @classmethod
-    def _calculate_weekly_rate(cls, entries_list):
-        if len(entries_list) < 14:
-            return None
+    def refresh_periods(cls, user, days):
+        user_id = getattr(user, "pk", user)
+        for granularity, _ in cls.GRANULARITY_CHOICES:
+            inicios = {cls.period_start_for(granularity, day) for day in days}
+            for inicio in inicios:
+                totais = WeightEntry.objects.filter(
+                    user_id=user_id,
+                    date__gte=inicio,
+                    date__lt=cls.period_end_for(granularity, inicio),
+                ).aggregate(**cls.aggregates())
 
-        first_week = entries_list[:7]
-        last_week = entries_list[-7:]
+                filtros = {
+                    "user_id": user_id,
+                    "granularity": granularity,
+                    "period_start": inicio,
+                }
+                if totais["entries_count"]:
+                    cls.objects.update_or_create(**filtros, defaults=totais)
+                else:
+                    cls.objects.filter(**filtros).delete()
 
-        first_week_avg = sum(float(e.weight_kg) for e in first_week) / len(first_week)
-        last_week_avg = sum(float(e.weight_kg) for e in last_week) / len(last_week)
+    @classmethod
+    def refresh_range(cls, user, first_day, last_day):
+        user_id = getattr(user, "pk", user)
+        for granularity, funcao in cls.PERIOD_FUNCTIONS.items():
+            inicio = cls.period_start_for(granularity, first_day)
+            fim = cls.period_end_for(
+                granularity, cls.period_start_for(granularity, last_day)
+            )
+            linhas = (
+                WeightEntry.objects.filter(
+                    user_id=user_id, date__gte=inicio, date__lt=fim
+                )
+                .order_by()
+                .annotate(period_start=funcao("date"))
+                .values("period_start")
+                .annotate(**cls.aggregates())
+            )
+            novos = [
+                cls(user_id=user_id, granularity=granularity, **linha)
+                for linha in linhas
+            ]
+            cls.objects.filter(
+                user_id=user_id,
+                granularity=granularity,
+                period_start__gte=inicio,
+                period_start__lt=fim,
+            ).delete()
+            cls.objects.bulk_create(novos, batch_size=500)
 
-        weeks_diff = (entries_list[-1].date - entries_list[0].date).days / 7
-        if weeks_diff > 0:
-            return round((last_week_avg - first_week_avg) / weeks_diff, 2)
-        return None
+    @classmethod
+    def expected_rollups(cls, entries):
+        esperados = {}
+        for granularity, funcao in cls.PERIOD_FUNCTIONS.items():
+            linhas = (
+                entries.order_by()
+                .annotate(period_start=funcao("date"))
+                .values("user", "period_start")
+                .annotate(**cls.aggregates())
+            )
+            for linha in linhas:
+                chave = (linha.pop("user"), granularity, linha.pop("period_start"))
+                esperados[chave] = linha
+        return esperados
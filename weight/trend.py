@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from math import sqrt
+from statistics import NormalDist
+
+DIAS_POR_SEMANA = 7
+MINIMO_PESAGENS = 3
+CONFIANCA_PADRAO = 0.95
+JANELAS_TENDENCIA = (30, 90, 180, 365)
+JANELA_PADRAO_TENDENCIA = 90
+INCLINACAO_MINIMA = 1e-6
+
+
+def _quantil_t(probabilidade, graus_liberdade):
+    z = NormalDist().inv_cdf(probabilidade)
+    gl = graus_liberdade
+    return (
+        z
+        + (z**3 + z) / (4 * gl)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * gl**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * gl**3)
+    )
+
+
+class WeightTrend:
+
+    @staticmethod
+    def ajustar(datas, pesos, confianca=CONFIANCA_PADRAO, casas=2):
+        n = len(datas)
+        if n < MINIMO_PESAGENS or datas[0] == datas[-1]:
+            return None
+
+        origem_x = datas[0].toordinal()
+        origem_y = pesos[0]
+        soma_x = soma_y = soma_xx = soma_xy = soma_yy = 0.0
+        for data, peso in zip(datas, pesos):
+            x = data.toordinal() - origem_x
+            y = peso - origem_y
+            soma_x += x
+            soma_y += y
+            soma_xx += x * x
+            soma_xy += x * y
+            soma_yy += y * y
+
+        sxx = soma_xx - soma_x * soma_x / n
+        sxy = soma_xy - soma_x * soma_y / n
+        syy = soma_yy - soma_y * soma_y / n
+
+        inclinacao = sxy / sxx
+        intercepto = (soma_y - inclinacao * soma_x) / n + origem_y
+        residuos = max(syy - inclinacao * sxy, 0.0)
+        erro_padrao = sqrt(residuos / (n - 2) / sxx)
+        margem = _quantil_t(1 - (1 - confianca) / 2, n - 2) * erro_padrao
+
+        ultimo_x = datas[-1].toordinal() - origem_x
+        return {
+            "weekly_rate": round(inclinacao * DIAS_POR_SEMANA, casas),
+            "weekly_rate_low": round((inclinacao - margem) * DIAS_POR_SEMANA, casas),
+            "weekly_rate_high": round((inclinacao + margem) * DIAS_POR_SEMANA, casas),
+            "confidence": confianca,
+            "trend_weight": round(intercepto + inclinacao * ultimo_x, casas),
+            "entries": n,
+            "start_date": datas[0].isoformat(),
+            "end_date": datas[-1].isoformat(),
+            "slope_per_day": inclinacao,
+            "slope_margin": margem,
+        }
+
+    @staticmethod
+    def ler_parametros(parametros, janela_padrao=JANELA_PADRAO_TENDENCIA):
+
+        try:
+            janela = int(parametros.get("trend_days", janela_padrao))
+        except (TypeError, ValueError):
+            janela = janela_padrao
+        if janela not in JANELAS_TENDENCIA:
+            janela = janela_padrao
+
+        try:
+            peso_alvo = float(parametros.get("target", "").replace(",", "."))
+        except ValueError:
+            peso_alvo = None
+        if peso_alvo is not None and not 0 < peso_alvo < 1000:
+            peso_alvo = None
+
+        return janela, peso_alvo
+
+    @staticmethod
+    def _dias_ate(diferenca, inclinacao, limite):
+        if abs(inclinacao) < INCLINACAO_MINIMA:
+            return None
+        dias = diferenca / inclinacao
+        if dias < 0 or dias > limite:
+            return None
+        return dias
+
+    @classmethod
+    def projetar(cls, ajuste, peso_alvo):
+        if ajuste is None or peso_alvo is None:
+            return None
+
+        data_referencia = date.fromisoformat(ajuste["end_date"])
+        diferenca = float(peso_alvo) - ajuste["trend_weight"]
+        inclinacao = ajuste["slope_per_day"]
+        margem = ajuste["slope_margin"]
+        if diferenca == 0:
+            return {
+                "target_weight": float(peso_alvo),
+                "status": "reached",
+                "date": data_referencia,
+                "earliest": data_referencia,
+                "latest": data_referencia,
+            }
+
+        limite = (date.max - data_referencia).days
+        dias = cls._dias_ate(diferenca, inclinacao, limite)
+        if dias is None:
+            afastando = (
+                abs(inclinacao) >= INCLINACAO_MINIMA and diferenca / inclinacao < 0
+            )
+            return {
+                "target_weight": float(peso_alvo),
+                "status": "diverging" if afastando else "no_projection",
+            }
+
+        direcao = 1 if inclinacao > 0 else -1
+        mais_rapido = cls._dias_ate(diferenca, inclinacao + direcao * margem, limite)
+        mais_lento = cls._dias_ate(diferenca, inclinacao - direcao * margem, limite)
+
+        def para_data(quantidade):
+            if quantidade is None:
+                return None
+            return data_referencia + timedelta(days=round(quantidade))
+
+        return {
+            "target_weight": float(peso_alvo),
+            "status": "on_track",
+            "date": para_data(dias),
+            "earliest": para_data(mais_rapido),
+            "latest": para_data(mais_lento),
+        }
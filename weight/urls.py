@@ -6,6 +6,8 @@ app_name = "weight"
 urlpatterns = [
     path("", views.WeightTrackerView.as_view(), name="tracker"),
     path("chart-data/", views.ChartDataView.as_view(), name="chart_data"),
+    path("trend/", views.WeightTrendView.as_view(), name="trend"),
+    path("import/", views.WeightImportView.as_view(), name="import"),
     path("<int:pk>/editar/", views.WeightEntryEditView.as_view(), name="entry_edit"),
     path(
         "<int:pk>/excluir/", views.WeightEntryDeleteView.as_view(), name="entry_delete"
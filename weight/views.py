@@ -1,20 +1,24 @@
-import json
 from datetime import date
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.views import View
 
-from .models import WeightEntry
+from .models import LABEL_FORMATS as GRANULARIDADES_GRAFICO, WeightEntry
+from .importers import WeightImporter
+from .trend import JANELAS_TENDENCIA, WeightTrend
 from .forms import WeightEntryForm
 from shared.utils import (
     AjaxFormProcessorMixin,
     AjaxCRUDMixin,
     ContextDataMixin,
+    JsonResponseHelper,
+    VersionedETagMixin,
 )
+from shared.pagination import KeysetPaginator
+from shared.timeseries import TimeSeriesUtils
 
 
 class WeightTrackerView(ContextDataMixin, LoginRequiredMixin, View):
@@ -24,20 +28,25 @@ class WeightTrackerView(ContextDataMixin, LoginRequiredMixin, View):
         if form is None:
             form = WeightEntryForm(initial={"date": date.today()})
 
-        all_entries = WeightEntry.objects.filter(user=self.request.user)
-        paginator = Paginator(all_entries, 10)
-        page_number = self.request.GET.get("page")
-        entries = paginator.get_page(page_number)
-
-        metrics = WeightEntry.get_user_metrics(self.request.user)
+        paginator = KeysetPaginator(
+            WeightEntry.objects.filter(user=self.request.user), "date"
+        )
+        entries = paginator.get_page(self.request.GET.get("cursor"))
 
-        dados_grafico = WeightEntry.get_chart_data(self.request.user, days_limit=365)
+        versao = WeightEntry.data_version(self.request.user)
+        metrics = WeightEntry.get_user_metrics(self.request.user, versao)
+        dias_tendencia, peso_alvo = WeightTrend.ler_parametros(self.request.GET)
+        tendencia = WeightEntry.get_trend(self.request.user, dias_tendencia, versao)
 
         return {
             "form": form,
             "entries": entries,
             "metrics": metrics,
-            "chart_data": json.dumps(dados_grafico),
+            "trend": tendencia,
+            "trend_days": dias_tendencia,
+            "trend_windows": JANELAS_TENDENCIA,
+            "target_weight": peso_alvo,
+            "projection": WeightTrend.projetar(tendencia, peso_alvo),
         }
 
     def _handle_unique_constraint_error(self, exception):
@@ -72,13 +81,66 @@ class WeightTrackerView(ContextDataMixin, LoginRequiredMixin, View):
         return render(request, self.template_name, context)
 
 
-class ChartDataView(LoginRequiredMixin, View):
+class ChartDataView(VersionedETagMixin, LoginRequiredMixin, View):
+    datasets_versionados = ["weight"]
+
     def get(self, request, *args, **kwargs):
         days = int(request.GET.get("days", 365))
-        chart_data = WeightEntry.get_chart_data(request.user, days_limit=days)
+        granularidade = request.GET.get("granularity")
+        if granularidade not in GRANULARIDADES_GRAFICO:
+            granularidade = None
+        janela, metodo = TimeSeriesUtils.ler_parametros_media_movel(request.GET)
+        chart_data = WeightEntry.get_chart_data(
+            request.user,
+            days_limit=days,
+            window_days=janela,
+            method=metodo,
+            max_points=TimeSeriesUtils.ler_maximo_pontos(request.GET),
+            granularity=granularidade,
+        )
         return JsonResponse(chart_data)
 
 
+class WeightTrendView(VersionedETagMixin, LoginRequiredMixin, View):
+    datasets_versionados = ["weight"]
+
+    def get(self, request, *args, **kwargs):
+        dias, peso_alvo = WeightTrend.ler_parametros(request.GET)
+        tendencia = WeightEntry.get_trend(
+            request.user, dias, self.versoes_dados.get("weight")
+        )
+        return JsonResponse(
+            {
+                "days": dias,
+                "trend": tendencia,
+                "projection": WeightTrend.projetar(tendencia, peso_alvo),
+            }
+        )
+
+
+class WeightImportView(LoginRequiredMixin, View):
+    def post(self, request):
+        arquivo = request.FILES.get("arquivo")
+        if not arquivo:
+            return JsonResponseHelper.erro("Arquivo não fornecido")
+
+        formato = request.POST.get("formato") or WeightImporter.detectar_formato(
+            arquivo.name
+        )
+        if formato not in ("csv", "json"):
+            return JsonResponseHelper.erro("Formato inválido")
+
+        importador = WeightImporter(request.user)
+        try:
+            resultado = importador.importar(arquivo, formato)
+        except ValueError as e:
+            return JsonResponseHelper.erro(
+                f"Arquivo inválido: {e}", dados_extras=importador.resultado()
+            )
+
+        return JsonResponseHelper.sucesso(resultado)
+
+
 class WeightEntryEditView(LoginRequiredMixin, View):
     def post(self, request, pk):
 